@@ -0,0 +1,134 @@
+"""
+时权链 (Time-Rights Chain) - 工作量证明的Numba加速内核
+把"写入nonce -> SHA-256 -> 比较难度"的整个内层循环编译为机器码，输入为80字节区块头
+
+numba 为可选依赖：未安装时 NUMBA_AVAILABLE 为 False，矿工节点继续使用 hashlib 实现；
+已安装时可设置环境变量 CPC_POW_NUMBA=0 关闭
+"""
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    # SHA-256 轮常量
+    _K = np.array([
+        0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+        0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+        0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+        0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+        0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+        0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+        0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+        0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+    ], dtype=np.uint32)
+
+    # SHA-256 初始哈希值
+    _H0 = np.array([
+        0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19,
+    ], dtype=np.uint32)
+
+    @njit(cache=True, inline="always")
+    def _rotr(x, n):
+        return np.uint32((x >> np.uint32(n)) | (x << np.uint32(32 - n)))
+
+    @njit(cache=True)
+    def _compress(state, buf, offset, w):
+        """对 buf[offset:offset+64] 执行一次SHA-256压缩，原地更新state"""
+        for i in range(16):
+            j = offset + 4 * i
+            w[i] = ((np.uint32(buf[j]) << np.uint32(24)) | (np.uint32(buf[j + 1]) << np.uint32(16))
+                    | (np.uint32(buf[j + 2]) << np.uint32(8)) | np.uint32(buf[j + 3]))
+        for i in range(16, 64):
+            s0 = _rotr(w[i - 15], 7) ^ _rotr(w[i - 15], 18) ^ (w[i - 15] >> np.uint32(3))
+            s1 = _rotr(w[i - 2], 17) ^ _rotr(w[i - 2], 19) ^ (w[i - 2] >> np.uint32(10))
+            w[i] = np.uint32(w[i - 16] + s0 + w[i - 7] + s1)
+
+        a = state[0]
+        b = state[1]
+        c = state[2]
+        d = state[3]
+        e = state[4]
+        f = state[5]
+        g = state[6]
+        h = state[7]
+        for i in range(64):
+            S1 = _rotr(e, 6) ^ _rotr(e, 11) ^ _rotr(e, 25)
+            ch = np.uint32((e & f) ^ (~e & g))
+            t1 = np.uint32(h + S1 + ch + _K[i] + w[i])
+            S0 = _rotr(a, 2) ^ _rotr(a, 13) ^ _rotr(a, 22)
+            maj = (a & b) ^ (a & c) ^ (b & c)
+            t2 = np.uint32(S0 + maj)
+            h = g
+            g = f
+            f = e
+            e = np.uint32(d + t1)
+            d = c
+            c = b
+            b = a
+            a = np.uint32(t1 + t2)
+
+        state[0] += a
+        state[1] += b
+        state[2] += c
+        state[3] += d
+        state[4] += e
+        state[5] += f
+        state[6] += g
+        state[7] += h
+
+    @njit(cache=True)
+    def find_nonce(header_prefix, zero_len, nibble_mask, start, count):
+        """
+        在 [start, start + count) 范围内搜索nonce，使 sha256(区块头前76字节 + 4字节小端nonce) 满足难度
+        
+        前64字节只压缩一次得到midstate，每个nonce只对第二个块（剩余12字节 + nonce + 填充）做一次压缩
+        
+        Args:
+            header_prefix: 区块头中nonce之前的76字节（uint8数组）
+            zero_len: 摘要开头必须为0的字节数
+            nibble_mask: 紧随其后的字节需要为0的位
+            start: 起始nonce
+            count: 本批搜索的nonce数量
+        
+        Returns:
+            找到的nonce，本批没有则返回-1
+        """
+        w = np.empty(64, dtype=np.uint32)
+        midstate = _H0.copy()
+        _compress(midstate, header_prefix, 0, w)
+        
+        # 第二个块：12字节 + 4字节nonce + 0x80 + 若干0 + 64位大端消息长度（80字节 = 640位）
+        block = np.zeros(64, dtype=np.uint8)
+        block[:12] = header_prefix[64:76]
+        block[16] = 0x80
+        block[62] = 0x02
+        block[63] = 0x80
+        
+        state = np.empty(8, dtype=np.uint32)
+        for nonce in range(start, start + count):
+            block[12] = nonce & 0xFF
+            block[13] = (nonce >> 8) & 0xFF
+            block[14] = (nonce >> 16) & 0xFF
+            block[15] = (nonce >> 24) & 0xFF
+            
+            state[:] = midstate
+            _compress(state, block, 0, w)
+            
+            ok = True
+            for k in range(zero_len):
+                if (state[k // 4] >> np.uint32(24 - 8 * (k % 4))) & np.uint32(0xFF):
+                    ok = False
+                    break
+            if ok and nibble_mask:
+                if (state[zero_len // 4] >> np.uint32(24 - 8 * (zero_len % 4))) & np.uint32(nibble_mask):
+                    ok = False
+            if ok:
+                return nonce
+        
+        return -1
@@ -15,3 +15,9 @@ PEER_NODES = [
     # "http://peer2:5001",
 ]
 
+# 区块链持久化文件（区块以追加方式写入，节点重启时从中恢复）
+CHAIN_LOG_FILE = "chain.log"
+
+# 挖矿难度（区块哈希前导十六进制0的个数）
+# 难度每加1，平均所需哈希次数乘以16；难度不低于5时可设置环境变量 CPC_POW_WORKERS 用多进程搜索
+MINING_DIFFICULTY = 4
@@ -3,15 +3,31 @@
 基于SimpleCoin扩展，支持UTXO模型和版权交易
 """
 
+import os
 import time
 import hashlib
-import json
+import struct
+import orjson
 import threading
-from flask import Flask, request, jsonify
+import mmap
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import JSONProvider
 
 
-from utxo import UTXO, BlockchainUTXOManager, CopyrightPayload, TimeLockScript
+from utxo import UTXO, BlockchainUTXOManager, CopyrightPayload, TimeLockScript, COIN, to_sats
 from transaction import Transaction, TransactionInput, TransactionOutput, TransactionValidator
+from _pow_numba import NUMBA_AVAILABLE
+
+# 区块头固定为80字节后，Numba内核每个nonce只需一次压缩且没有逐次调用hashlib的开销，
+# 安装了numba时默认启用（设置 CPC_POW_NUMBA=0 可退回hashlib实现）
+USE_NUMBA_POW = NUMBA_AVAILABLE and os.environ.get("CPC_POW_NUMBA", "1") != "0"
+
+if USE_NUMBA_POW:
+    import numpy as np
+    from _pow_numba import find_nonce
 
 # 导入矿工配置
 try:
@@ -22,7 +38,40 @@ except ImportError:
     MINER_NODE_URL = "http://localhost:5001"
     PEER_NODES = []
 
+# 区块链持久化文件（旧版配置文件中可能没有这一项）
+try:
+    from cpc_config import CHAIN_LOG_FILE
+except ImportError:
+    CHAIN_LOG_FILE = "chain.log"
+
+# 挖矿难度（旧版配置文件中可能没有这一项）
+try:
+    from cpc_config import MINING_DIFFICULTY
+except ImportError:
+    MINING_DIFFICULTY = 4
+
+
+class OrjsonProvider(JSONProvider):
+    """使用orjson的Flask JSON序列化器，/blocks 等返回整条链的接口受益最明显"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 node = Flask(__name__)
+node.json = OrjsonProvider(node)
+
+# hashlib 的 SHA-256 由 OpenSSL 实现，OpenSSL 在运行时通过 CPUID 检测 SHA-NI 指令并自动启用，
+# 这里绑定一次构造函数，挖矿循环中每次哈希都省去 hashlib 模块的属性查找
+_sha256 = hashlib.sha256
+
+# 区块头中nonce之前的部分：index(4) | previous_hash(32) | merkle_root(32) | timestamp(8)
+# 加上4字节nonce共80字节；前64字节在挖矿中不变，每个nonce只需再做一次SHA-256压缩
+_HEADER_PREFIX = struct.Struct("<I32s32sd")
+MAX_NONCE = 0xFFFFFFFF
 
 
 class CPCBlock:
@@ -31,6 +80,12 @@ class CPCBlock:
     每个区块包含多个交易，并维护UTXO状态
     """
     
+    # 链上区块数量很多，使用 __slots__ 省去每个实例的 __dict__
+    __slots__ = (
+        "index", "timestamp", "transactions", "previous_hash", "nonce", "hash",
+        "_dict_cache", "_bytes_cache"
+    )
+    
     def __init__(self, index, timestamp, transactions, previous_hash, nonce=0):
         """
         初始化区块
@@ -48,29 +103,113 @@ class CPCBlock:
         self.previous_hash = previous_hash
         self.nonce = nonce
         self.hash = self.calculate_hash()
+        # 区块挖出后不再修改，序列化结果在首次使用时缓存
+        self._dict_cache = None
+        self._bytes_cache = None
+    
+    @staticmethod
+    def json_parts(index, timestamp, transactions, previous_hash):
+        """
+        以nonce为界，把区块的JSON序列化拆成前后两段字节
+        
+        按键排序后的顺序为 index, nonce, previous_hash, timestamp, transactions，
+        交易列表直接拼接每笔交易缓存的规范序列化，
+        结果与 orjson.dumps(区块字典, option=orjson.OPT_SORT_KEYS) 一致
+        
+        Returns:
+            (nonce之前的字节, nonce之后的字节)
+        """
+        left = b'{"index":' + orjson.dumps(index) + b',"nonce":'
+        # 各段先收集到列表再一次拼接，避免逐段 + 产生的中间bytes对象
+        right = b"".join([
+            b',"previous_hash":', orjson.dumps(previous_hash),
+            b',"timestamp":', orjson.dumps(timestamp),
+            b',"transactions":[',
+            b",".join([tx.canonical_bytes() for tx in transactions]),
+            b"]}",
+        ])
+        return left, right
+    
+    @staticmethod
+    def merkle_root(transactions):
+        """
+        计算交易列表的默克尔根（double-SHA256）
+        
+        叶子为每笔交易规范序列化的 sha256d；每层节点连续存放在一段字节中，
+        相邻两个32字节节点正好是一个64字节输入，逐层减半直到只剩根。
+        层内为奇数个节点时复制最后一个
+        
+        Returns:
+            32字节默克尔根（没有交易时为全0）
+        """
+        if not transactions:
+            return b"\x00" * 32
+        
+        level = b"".join(_sha256(_sha256(tx.canonical_bytes()).digest()).digest() for tx in transactions)
+        while len(level) > 32:
+            if len(level) % 64:
+                level += level[-32:]
+            view = memoryview(level)
+            level = b"".join([
+                _sha256(_sha256(view[i:i + 64]).digest()).digest() for i in range(0, len(level), 64)
+            ])
+        return level
+    
+    @staticmethod
+    def header_prefix(index, previous_hash, merkle_root, timestamp):
+        """
+        区块头中nonce之前的76字节
+        
+        Args:
+            index: 区块索引
+            previous_hash: 前一个区块的哈希（十六进制；创世区块为"0"）
+            merkle_root: 32字节默克尔根
+            timestamp: 时间戳
+        """
+        return _HEADER_PREFIX.pack(
+            index, bytes.fromhex(previous_hash.rjust(64, "0")), merkle_root, timestamp
+        )
+    
+    def header_bytes(self):
+        """80字节区块头，区块哈希即对它做SHA-256"""
+        prefix = self.header_prefix(
+            self.index, self.previous_hash, self.merkle_root(self.transactions), self.timestamp
+        )
+        return prefix + self.nonce.to_bytes(4, "little")
+    
+    def calculate_hash_bytes(self):
+        """计算区块哈希（原始32字节摘要）"""
+        return _sha256(self.header_bytes()).digest()
     
     def calculate_hash(self):
-        """计算区块哈希"""
-        block_data = {
-            "index": self.index,
-            "timestamp": self.timestamp,
-            "transactions": [tx.to_dict() for tx in self.transactions],
-            "previous_hash": self.previous_hash,
-            "nonce": self.nonce
-        }
-        block_string = json.dumps(block_data, sort_keys=True)
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        """计算区块哈希（十六进制字符串，用于展示和序列化）"""
+        return self.calculate_hash_bytes().hex()
+    
+    def to_json_bytes(self):
+        """
+        区块的JSON字节（按键排序，与 orjson.dumps(to_dict(), option=OPT_SORT_KEYS) 一致）
+        
+        交易部分直接拼接每笔交易缓存的字节
+        """
+        if self._bytes_cache is None:
+            left, right = self.json_parts(self.index, self.timestamp, self.transactions, self.previous_hash)
+            self._bytes_cache = (
+                b'{"hash":' + orjson.dumps(self.hash) + b"," + left[1:] + str(self.nonce).encode() + right
+            )
+        return self._bytes_cache
     
     def to_dict(self):
-        """转换为字典"""
-        return {
-            "index": self.index,
-            "timestamp": self.timestamp,
-            "transactions": [tx.to_dict() for tx in self.transactions],
-            "previous_hash": self.previous_hash,
-            "nonce": self.nonce,
-            "hash": self.hash
-        }
+        """转换为字典（结果被缓存，调用方不应修改）"""
+        if self._dict_cache is None:
+            self._dict_cache = {
+                "index": self.index,
+                "timestamp": self.timestamp,
+                "transactions": [tx.to_dict() for tx in self.transactions],
+                "previous_hash": self.previous_hash,
+                "nonce": self.nonce,
+                "hash": self.hash
+            }
+        return self._dict_cache
     
     @classmethod
     def from_dict(cls, data):
@@ -83,7 +222,9 @@ class CPCBlock:
             previous_hash=data["previous_hash"],
             nonce=data.get("nonce", 0)
         )
-        block.hash = data.get("hash", block.calculate_hash())
+        # __init__ 已经计算过哈希；dict.get 的默认值会被提前求值，重放链日志时每个区块要多算一次
+        if "hash" in data:
+            block.hash = data["hash"]
         return block
 
 
@@ -122,47 +263,485 @@ def create_genesis_block():
     return genesis_block
 
 
+# 追加写入区块记录与 /blocks 读取文件之间的互斥
+_chain_log_lock = threading.Lock()
+
+
+def _append_block_record(block):
+    """
+    把区块追加到链日志文件
+    
+    每条记录为 4字节小端长度 + 区块的JSON字节
+    """
+    record = block.to_json_bytes()
+    with _chain_log_lock:
+        with open(CHAIN_LOG_FILE, "ab") as f:
+            f.write(len(record).to_bytes(4, "little") + record)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _iter_block_records(data):
+    """
+    依次取出链日志中的完整记录
+    
+    Yields:
+        (记录结束位置, 区块JSON字节)；末尾不完整的记录（写入中断）被忽略
+    """
+    pos = 0
+    while pos + 4 <= len(data):
+        length = int.from_bytes(data[pos:pos + 4], "little")
+        end = pos + 4 + length
+        if end > len(data):
+            break
+        yield end, data[pos + 4:end]
+        pos = end
+
+
+def load_blockchain():
+    """
+    从链日志恢复区块链，日志不存在时创建创世区块并写入日志
+    
+    Returns:
+        区块列表
+    """
+    blockchain = []
+    valid_end = 0
+    if os.path.exists(CHAIN_LOG_FILE):
+        with open(CHAIN_LOG_FILE, "rb") as f:
+            data = f.read()
+        for valid_end, record in _iter_block_records(data):
+            blockchain.append(CPCBlock.from_dict(orjson.loads(record)))
+        
+        # 截掉上次写入中断留下的半条记录
+        if valid_end < len(data):
+            with open(CHAIN_LOG_FILE, "r+b") as f:
+                f.truncate(valid_end)
+    
+    if not blockchain:
+        genesis_block = create_genesis_block()
+        _append_block_record(genesis_block)
+        blockchain.append(genesis_block)
+    
+    return blockchain
+
+
 # 全局变量
-BLOCKCHAIN = [create_genesis_block()]
-NODE_PENDING_TRANSACTIONS = []
+# 启动时由 init_blockchain() 从链日志填充；导入本模块（如工作量证明的子进程）不读写链日志
+BLOCKCHAIN = []
+# 待处理交易队列：Flask请求线程写入，挖矿线程取出
+# 元素为 (交易字典, 通过验证时的链高度)，未验证过的交易高度为None
+NODE_PENDING_TRANSACTIONS = queue.SimpleQueue()
+
+
+def init_blockchain():
+    """
+    从链日志加载区块链到 BLOCKCHAIN（原地填充，已加载时不重复加载）
+    
+    节点入口（直接运行本模块或WSGI入口）在启动服务前调用
+    """
+    if not BLOCKCHAIN:
+        BLOCKCHAIN.extend(load_blockchain())
+
+
+# 工作量证明每批搜索的nonce数量，批与批之间才做共识检查等额外工作
+POW_BATCH_SIZE = 4096
+
+# 并行搜索nonce的进程数，为1时在当前线程中搜索
+# （设置 CPC_POW_WORKERS 开启多进程搜索，只在 MINING_DIFFICULTY 不低于 POW_PARALLEL_MIN_DIFFICULTY 时生效）
+POW_WORKERS = int(os.environ.get("CPC_POW_WORKERS", "1"))
+
+# 难度低于这个值时不使用多进程：难度4平均只需约6.5万次哈希，单线程十几毫秒即可完成，
+# 向进程池派发任务、等待各分片停止的开销反而更大
+POW_PARALLEL_MIN_DIFFICULTY = 5
+
+# 多进程搜索使用的进程池和停止事件（第一次需要时创建，之后在进程生命周期内复用）
+_POW_EXECUTOR = None
+_POW_STOP_EVENT = None
+_POW_SHARD_STOP = None  # 子进程中由进程池初始化函数设置
+_pow_pool_lock = threading.Lock()
+
+
+def _difficulty_target(difficulty):
+    """
+    把"十六进制前导0的个数"换算成对原始摘要的字节判断条件
+    
+    Returns:
+        (必须全为0的前缀字节, 下一个字节高4位的掩码；难度为偶数时掩码为0)
+    """
+    zero_prefix = b"\x00" * (difficulty // 2)
+    nibble_mask = 0xF0 if difficulty % 2 else 0
+    return zero_prefix, nibble_mask
+
+
+def _search_nonces(header_prefix, zero_prefix, nibble_mask, start, count):
+    """
+    在 [start, start + count) 范围内搜索满足难度要求的nonce
+    
+    直接比较原始摘要字节，不再为每个nonce生成十六进制字符串；
+    开启Numba内核时整批搜索交给编译后的代码完成，否则逐个调用hashlib
+    
+    Args:
+        header_prefix: 区块头中nonce之前的76字节
+        zero_prefix: 摘要必须以之开头的全0字节
+        nibble_mask: 紧随其后的字节需要为0的位（奇数难度时为0xF0）
+        start: 起始nonce
+        count: 本批搜索的nonce数量（超出4字节nonce范围的部分被忽略）
+    
+    Returns:
+        找到的nonce，本批没有则返回None
+    """
+    zero_len = len(zero_prefix)
+    end = min(start + count, MAX_NONCE + 1)
+    
+    if USE_NUMBA_POW:
+        found = find_nonce(
+            np.frombuffer(header_prefix, dtype=np.uint8), zero_len, nibble_mask, start, end - start
+        )
+        return found if found >= 0 else None
+    
+    # 前64字节的哈希状态（midstate）只计算一次，每个nonce从它的拷贝继续，
+    # 剩余16字节加上填充正好是一次压缩
+    base = _sha256(header_prefix[:64])
+    tail = header_prefix[64:]
+    for nonce in range(start, end):
+        h = base.copy()
+        h.update(tail + nonce.to_bytes(4, "little"))
+        digest = h.digest()
+        if digest[:zero_len] == zero_prefix and (not nibble_mask or not digest[zero_len] & nibble_mask):
+            return nonce
+    return None
+
+
+def _init_pow_worker(stop_event):
+    """进程池初始化：保存共享的停止事件（同步原语只能在创建子进程时传入，不能随任务pickle）"""
+    global _POW_SHARD_STOP
+    _POW_SHARD_STOP = stop_event
+
+
+def _get_pow_executor():
+    """
+    返回工作量证明的进程池，第一次调用时创建
+    
+    使用spawn方式启动子进程：节点进程中运行着Flask请求线程，从挖矿线程fork会复制这些线程持有的锁
+    """
+    global _POW_EXECUTOR, _POW_STOP_EVENT
+    with _pow_pool_lock:
+        if _POW_EXECUTOR is None:
+            ctx = multiprocessing.get_context("spawn")
+            _POW_STOP_EVENT = ctx.Event()
+            _POW_EXECUTOR = ProcessPoolExecutor(
+                max_workers=POW_WORKERS, mp_context=ctx,
+                initializer=_init_pow_worker, initargs=(_POW_STOP_EVENT,)
+            )
+        return _POW_EXECUTOR, _POW_STOP_EVENT
+
+
+def _search_shard(header_prefix, zero_prefix, nibble_mask, shard, shards):
+    """
+    在子进程中搜索一个nonce分片
+    
+    第 j 批覆盖 [(j * shards + shard) * POW_BATCH_SIZE, +POW_BATCH_SIZE)，
+    各分片的区间互不重叠；每批之间检查一次其他进程是否已经找到
+    
+    Args:
+        header_prefix: 区块头中nonce之前的76字节
+        zero_prefix: 摘要必须以之开头的全0字节
+        nibble_mask: 紧随其后的字节需要为0的位
+        shard: 分片编号
+        shards: 分片总数
+    
+    Returns:
+        找到的nonce，被其他分片抢先或分片搜索完毕时返回None
+    """
+    stop_event = _POW_SHARD_STOP
+    batch = shard
+    while not stop_event.is_set() and batch * POW_BATCH_SIZE <= MAX_NONCE:
+        found = _search_nonces(
+            header_prefix, zero_prefix, nibble_mask, batch * POW_BATCH_SIZE, POW_BATCH_SIZE
+        )
+        if found is not None:
+            stop_event.set()
+            return found
+        batch += shards
+    return None
 
 
-def proof_of_work(last_block, transactions, difficulty=4):
+def proof_of_work(last_block, transactions, difficulty=4, timestamp=None):
     """
     工作量证明
     寻找符合难度要求的nonce
     
+    POW_WORKERS 大于1且难度不低于 POW_PARALLEL_MIN_DIFFICULTY 时，
+    把nonce空间按批交错分给多个进程并行搜索
+    
     Args:
         last_block: 上一个区块
         transactions: 要打包的交易列表（Transaction对象）
         difficulty: 难度（哈希前导0的数量）
+        timestamp: 候选区块的时间戳（整个搜索过程中保持不变，默认取当前时间）
     
     Returns:
-        nonce值
+        nonce值；4字节nonce空间内没有满足难度的值时返回None（需要更换时间戳重试）
     """
+    if timestamp is None:
+        timestamp = time.time()
+    
+    # 默克尔根和区块头前76字节只计算一次
+    header_prefix = CPCBlock.header_prefix(
+        last_block.index + 1, last_block.hash, CPCBlock.merkle_root(transactions), timestamp
+    )
+    
+    zero_prefix, nibble_mask = _difficulty_target(difficulty)
+    
+    if POW_WORKERS > 1 and difficulty >= POW_PARALLEL_MIN_DIFFICULTY:
+        # 使用进程而不是线程：循环中的Python代码仍然受GIL限制
+        executor, stop_event = _get_pow_executor()
+        stop_event.clear()
+        futures = [
+            executor.submit(
+                _search_shard, header_prefix, zero_prefix, nibble_mask, shard, POW_WORKERS
+            )
+            for shard in range(POW_WORKERS)
+        ]
+        found = None
+        for future in as_completed(futures):
+            found = future.result()
+            if found is not None:
+                stop_event.set()
+                break
+        # 等所有分片停下再返回：进程池被下一次搜索复用，停止事件届时会被清除
+        wait(futures)
+        return found
+    
     nonce = 0
-    target = "0" * difficulty
     
-    while True:
-        # 创建候选区块
-        candidate_block = CPCBlock(
-            index=last_block.index + 1,
-            timestamp=time.time(),
-            transactions=transactions,
-            previous_hash=last_block.hash,
-            nonce=nonce
-        )
+    while nonce <= MAX_NONCE:
+        found = _search_nonces(header_prefix, zero_prefix, nibble_mask, nonce, POW_BATCH_SIZE)
+        if found is not None:
+            return found
         
-        # 检查哈希是否满足难度要求
-        if candidate_block.hash.startswith(target):
-            return nonce
+        nonce += POW_BATCH_SIZE
         
-        nonce += 1
+        # 每批检查一次是否有新区块
+        # TODO: 检查共识
+    
+    return None
+
+
+# 增量维护的全链UTXO表：S_{n+1} = S_n • B_{n+1}
+# 区块追加到BLOCKCHAIN后按顺序应用，查询时不再从创世区块重新扫描。
+# 这里只保存手续费计算用的金额和 /copyright 用的作品哈希索引；
+# /utxo 与交易验证一致，只返回最近3个月内的UTXO，由 CHAIN_UTXO_MANAGER 提供
+_UTXO_AMOUNTS = {}  # (txid, vout) -> 整数金额（最小单位），手续费计算只读这一张表，不访问UTXO对象
+_COPYRIGHT_UTXOS = {}  # (txid, vout) -> 版权UTXO
+_UTXO_BY_WORK_HASH = {}  # 作品哈希 -> {(txid, vout): 版权UTXO}
+_utxo_state = {"height": 0, "tip_hash": None}
+_utxo_lock = threading.Lock()
+
+# 交易验证器和 /utxo 共用的UTXO管理器：按验证规则的时间窗口增量扫描BLOCKCHAIN，
+# 每次挖矿、每笔提交的交易、每次查询不必各自从头扫描
+CHAIN_UTXO_MANAGER = BlockchainUTXOManager(BLOCKCHAIN)
+
+
+def _index_output(key, output):
+    """把一个新的交易输出加入金额表，版权输出同时加入作品哈希索引"""
+    _UTXO_AMOUNTS[key] = to_sats(output.amount)
+    if output.utxo_type == "copyright" and output.payload:
+        utxo = UTXO(
+            txid=key[0],
+            vout=key[1],
+            amount=output.amount,
+            address=output.address,
+            script_pubkey=output.script_pubkey,
+            utxo_type=output.utxo_type,
+            payload=output.payload
+        )
+        _COPYRIGHT_UTXOS[key] = utxo
+        _UTXO_BY_WORK_HASH.setdefault(output.payload.get("work_hash"), {})[key] = utxo
+
+
+def _unindex_output(key):
+    """把被花费的输出从金额表和作品哈希索引中移除（不存在时忽略）"""
+    if _UTXO_AMOUNTS.pop(key, None) is None:
+        return
+    utxo = _COPYRIGHT_UTXOS.pop(key, None)
+    if utxo is not None:
+        _UTXO_BY_WORK_HASH.get(utxo.payload.get("work_hash"), {}).pop(key, None)
+
+
+def _apply_block(block):
+    """
+    把一个区块应用到UTXO表：移除被花费的输出，加入新的输出
+    
+    与 BlockchainUTXOManager.scan_blockchain 对单个区块的处理一致
+    
+    Args:
+        block: 新追加的区块
+    """
+    for tx in block.transactions:
+        for inp in tx.inputs:
+            _unindex_output((inp.txid, inp.vout))
+        
+        txid = tx.txid
+        for vout, output in enumerate(tx.outputs):
+            key = (txid, vout)
+            _unindex_output(key)  # 重复的交易ID覆盖旧输出（正常情况下不会发生）
+            _index_output(key, output)
+
+
+def _sync_utxo_set(blockchain=None):
+    """
+    把UTXO表追到链尾，只应用尚未应用过的区块
+    
+    已应用部分与当前链不一致（链被替换）时从创世区块重建。调用方需持有 _utxo_lock
+    
+    Args:
+        blockchain: 区块链列表（默认为本节点的BLOCKCHAIN）
+    """
+    if blockchain is None:
+        blockchain = BLOCKCHAIN
+    
+    height = _utxo_state["height"]
+    if height > len(blockchain) or (height and blockchain[height - 1].hash != _utxo_state["tip_hash"]):
+        _UTXO_AMOUNTS.clear()
+        _COPYRIGHT_UTXOS.clear()
+        _UTXO_BY_WORK_HASH.clear()
+        height = 0
+    
+    for block in blockchain[height:]:
+        _apply_block(block)
+    
+    _utxo_state["height"] = len(blockchain)
+    _utxo_state["tip_hash"] = blockchain[-1].hash
+
+
+def get_work_copyright_utxos(work_hash):
+    """获取某个作品当前的所有版权UTXO（整条链）"""
+    with _utxo_lock:
+        _sync_utxo_set()
+        return list(_UTXO_BY_WORK_HASH.get(work_hash, {}).values())
+
+
+def _group_conflicting_transactions(transactions):
+    """
+    按输入UTXO把交易分组（并查集）
+    
+    花费同一个 (txid, vout) 的交易落在同一组，不同组之间互不冲突，可以并行验证
+    
+    Args:
+        transactions: 交易列表（Transaction对象）
+    
+    Returns:
+        交易下标列表的列表，组内与组间都保持原有顺序
+    """
+    parent = list(range(len(transactions)))
+    
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    first_spender = {}  # (txid, vout) -> 第一个花费它的交易下标
+    for i, tx in enumerate(transactions):
+        for inp in tx.inputs:
+            key = (inp.txid, inp.vout)
+            if key in first_spender:
+                root_a, root_b = find(i), find(first_spender[key])
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+            else:
+                first_spender[key] = i
+    
+    groups = {}
+    for i in range(len(transactions)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def _validate_group(validator, transactions, indices, prevalidated, utxo_map=None, now=None):
+    """
+    按顺序验证一组可能相互冲突的交易，先到先得
+    
+    已在当前链状态下验证过的交易跳过完整验证，但仍参与冲突检查
+    
+    Args:
+        utxo_map: 预取的 {(txid, vout): UTXO}，所有组共用（只读）
+        now: 整批验证共用的当前时间戳
+    
+    Returns:
+        [(下标, 是否有效, 错误信息)]
+    """
+    results = []
+    spent = set()
+    for i in indices:
+        tx = transactions[i]
+        if prevalidated[i]:
+            is_valid, error_msg = True, ""
+        else:
+            try:
+                is_valid, error_msg = validator.validate_transaction(tx, utxo_map, now)
+            except Exception as e:
+                is_valid, error_msg = False, str(e)
         
-        # 每1000次检查一次是否有新区块
-        if nonce % 1000 == 0:
-            # TODO: 检查共识
-            pass
+        if is_valid:
+            keys = [(inp.txid, inp.vout) for inp in tx.inputs]
+            if spent.intersection(keys):
+                is_valid, error_msg = False, "与本区块中更早的交易花费了同一个UTXO"
+            else:
+                spent.update(keys)
+        results.append((i, is_valid, error_msg))
+    return results
+
+
+def validate_transactions_parallel(validator, transactions, prevalidated=None):
+    """
+    并行验证一批交易
+    
+    互不冲突的交易组分配到线程池中同时验证；组内冲突的交易按提交顺序串行验证，
+    只接受第一笔有效的
+    
+    Args:
+        validator: 交易验证器
+        transactions: 交易列表（Transaction对象）
+        prevalidated: 与 transactions 对应的布尔列表，为True的交易已在当前链状态下验证过
+    
+    Returns:
+        与 transactions 一一对应的 (是否有效, 错误信息) 列表
+    """
+    if prevalidated is None:
+        prevalidated = [False] * len(transactions)
+    
+    groups = _group_conflicting_transactions(transactions)
+    results = [None] * len(transactions)
+    
+    # 所有需要完整验证的交易引用的UTXO只扫描一次区块取得；整批使用同一个当前时间
+    now = int(time.time())
+    utxo_map = validator.prefetch_utxos(
+        [tx for tx, done in zip(transactions, prevalidated) if not done], now
+    )
+    
+    workers = min(os.cpu_count() or 1, len(groups))
+    if workers <= 1:
+        # 只有一组（或单核）时组间没有并行，改为在签名层面用线程池并行验证
+        validator.preverify_signatures(
+            [tx for tx, done in zip(transactions, prevalidated) if not done]
+        )
+        group_results = [
+            _validate_group(validator, transactions, group, prevalidated, utxo_map, now) for group in groups
+        ]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            group_results = list(executor.map(
+                lambda group: _validate_group(validator, transactions, group, prevalidated, utxo_map, now),
+                groups
+            ))
+    
+    for group_result in group_results:
+        for i, is_valid, error_msg in group_result:
+            results[i] = (is_valid, error_msg)
+    return results
 
 
 def mine_block(blockchain, pending_transactions):
@@ -170,43 +749,58 @@ def mine_block(blockchain, pending_transactions):
     挖矿函数
     验证交易并挖掘新区块
     使用基于区块扫描的UTXO管理器，而不是全局UTXO池
+    
+    Args:
+        blockchain: 区块链列表
+        pending_transactions: (交易字典, 验证时链高度) 列表
     """
-    validator = TransactionValidator(blockchain)
+    validator = TransactionValidator(
+        blockchain, utxo_manager=CHAIN_UTXO_MANAGER if blockchain is BLOCKCHAIN else None
+    )
     
     # 验证所有待处理的交易，并计算总手续费
     valid_transactions = []
-    total_fees = 0.0  # 累计所有交易的手续费
+    total_fees = 0  # 累计所有交易的手续费（整数最小单位）
+    
+    # 手续费计算直接读取增量维护的UTXO集合
+    with _utxo_lock:
+        _sync_utxo_set(blockchain)
     
-    for tx_data in pending_transactions:
+    transactions = []
+    prevalidated = []  # 提交时已在当前链高度下验证过的交易不再重复完整验证
+    for tx_data, validated_at_height in pending_transactions:
         try:
-            tx = Transaction.from_dict(tx_data)
-            is_valid, error_msg = validator.validate_transaction(tx)
-            if is_valid:
-                valid_transactions.append(tx)
-                
-                # 计算该交易的手续费（输入总额 - 输出总额）
-                # 只有有输入的交易才会产生手续费
-                if len(tx.inputs) > 0:  # 水龙头交易没有输入
-                    input_amount = 0.0
-                    for inp in tx.inputs:
-                        utxo = validator.utxo_manager.get_utxo(inp.txid, inp.vout, scan_months=3)
-                        if utxo:
-                            input_amount += utxo.amount
-                    
-                    output_amount = sum(out.amount for out in tx.outputs)
-                    fee = input_amount - output_amount
-                    total_fees += fee
-                    
-                    if fee > 0:
-                        print(f"  交易 {tx.txid[:8]}... 手续费: {fee:.4f} CPC")
-            else:
-                print(f"交易 {tx.txid} 验证失败: {error_msg}")
+            transactions.append(Transaction.from_dict(tx_data))
+            prevalidated.append(validated_at_height == len(blockchain))
         except Exception as e:
             print(f"交易解析失败: {e}")
     
+    results = validate_transactions_parallel(validator, transactions, prevalidated)
+    amount_of = _UTXO_AMOUNTS.get
+    
+    for tx, (is_valid, error_msg) in zip(transactions, results):
+        if is_valid:
+            valid_transactions.append(tx)
+            
+            # 计算该交易的手续费（输入总额 - 输出总额）
+            # 只有有输入的交易才会产生手续费
+            if len(tx.inputs) > 0:  # 水龙头交易没有输入
+                input_amount = sum(
+                    amount_of((inp.txid, inp.vout), 0) for inp in tx.inputs
+                )
+                
+                output_amount = tx.output_sats()
+                fee = input_amount - output_amount
+                total_fees += fee
+                
+                if fee > 0:
+                    print(f"  交易 {tx.txid[:8]}... 手续费: {fee / COIN:.4f} CPC")
+        else:
+            print(f"交易 {tx.txid} 验证失败: {error_msg}")
+    
     # 添加挖矿奖励交易（区块奖励 + 所有交易手续费）
     block_reward = 1.0  # 固定区块奖励
-    total_reward = block_reward + total_fees  # 总奖励 = 区块奖励 + 手续费
+    total_reward = (to_sats(block_reward) + total_fees) / COIN  # 总奖励 = 区块奖励 + 手续费
     
     mining_reward_output = TransactionOutput(
         amount=total_reward,
@@ -225,7 +819,7 @@ def mine_block(blockchain, pending_transactions):
         metadata={
             "note": "挖矿奖励",
             "block_reward": block_reward,
-            "fees": total_fees,
+            "fees": total_fees / COIN,
             "total": total_reward
         }
     )
@@ -233,26 +827,34 @@ def mine_block(blockchain, pending_transactions):
     valid_transactions.append(reward_tx)
     
     if total_fees > 0:
-        print(f"💰 本区块总手续费: {total_fees:.4f} CPC")
+        print(f"💰 本区块总手续费: {total_fees / COIN:.4f} CPC")
     
     # 执行工作量证明
     last_block = blockchain[-1]
     print(f"开始挖矿区块 #{last_block.index + 1}，包含 {len(valid_transactions)} 笔交易...")
-    nonce = proof_of_work(last_block, valid_transactions, difficulty=4)
+    # 时间戳在挖矿前确定，保证找到的nonce对最终区块同样有效；
+    # 4字节nonce用尽仍未找到时更换时间戳重新搜索
+    nonce = None
+    while nonce is None:
+        timestamp = time.time()
+        nonce = proof_of_work(last_block, valid_transactions, difficulty=MINING_DIFFICULTY, timestamp=timestamp)
     
     # 创建新区块
     new_block = CPCBlock(
         index=last_block.index + 1,
-        timestamp=time.time(),
+        timestamp=timestamp,
         transactions=valid_transactions,
         previous_hash=last_block.hash,
         nonce=nonce
     )
     
-    # 注意：不再需要手动更新UTXO池
-    # UTXO状态通过扫描区块自动重建
+    # 先写入链日志再加入内存，/blocks 读到的链不会比内存中的短
+    _append_block_record(new_block)
     
+    # UTXO集合在区块追加后增量更新
     blockchain.append(new_block)
+    with _utxo_lock:
+        _sync_utxo_set(blockchain)
     
     print(f"✓ 成功挖出区块 #{new_block.index}")
     print(f"  哈希: {new_block.hash}")
@@ -262,25 +864,40 @@ def mine_block(blockchain, pending_transactions):
     return new_block
 
 
+def drain_pending_transactions(first=None):
+    """
+    取出待处理队列中当前所有的交易
+    
+    Args:
+        first: 已经从队列中取出的第一笔交易（可选）
+    
+    Returns:
+        (交易字典, 验证时链高度) 列表
+    """
+    pending_txs = [] if first is None else [first]
+    try:
+        while True:
+            pending_txs.append(NODE_PENDING_TRANSACTIONS.get_nowait())
+    except queue.Empty:
+        pass
+    return pending_txs
+
+
 def mine_loop():
     """
     持续挖矿的循环（后台线程）
-    定期检查待处理交易并挖矿
+    等待待处理交易并挖矿
     """
-    global BLOCKCHAIN, NODE_PENDING_TRANSACTIONS
-    
     while True:
         try:
-            # 检查是否有待处理交易
-            if len(NODE_PENDING_TRANSACTIONS) > 0:
-                # 复制待处理交易列表，避免在挖矿过程中被修改
-                pending_txs = NODE_PENDING_TRANSACTIONS.copy()
-                new_block = mine_block(BLOCKCHAIN, pending_txs)
-                
-                # 清空待处理队列
-                NODE_PENDING_TRANSACTIONS.clear()
-            else:
-                time.sleep(1)  # 没有交易时休眠1秒后重新检查
+            # 阻塞等待第一笔交易（最多1秒），再一次性取出队列中其余的交易
+            try:
+                first = NODE_PENDING_TRANSACTIONS.get(timeout=1)
+            except queue.Empty:
+                continue
+            
+            pending_txs = drain_pending_transactions(first)
+            mine_block(BLOCKCHAIN, pending_txs)
         except Exception as e:
             print(f"挖矿循环错误: {e}")
             time.sleep(1)
@@ -290,12 +907,43 @@ def mine_loop():
 
 @node.route('/blocks', methods=['GET'])
 def get_blocks():
-    """获取区块链"""
-    global BLOCKCHAIN
+    """
+    获取区块链
+    直接从链日志文件映射读取已序列化的区块，逐个区块流式输出
+    """
+    with _chain_log_lock:
+        try:
+            f = open(CHAIN_LOG_FILE, "rb")
+        except FileNotFoundError:
+            # 还没有写入过任何区块
+            return jsonify([])
+        try:
+            chain_log = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            f.close()
+            return jsonify([])
+        except Exception:
+            f.close()
+            raise
+    
+    def generate():
+        try:
+            yield b"["
+            for i, (_, record) in enumerate(_iter_block_records(chain_log)):
+                if i:
+                    yield b","
+                yield record
+            yield b"]"
+        finally:
+            chain_log.close()
+            f.close()
     
-    # 返回区块链
-    chain_to_send = [block.to_dict() for block in BLOCKCHAIN]
-    return jsonify(chain_to_send)
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/json",
+        headers={"X-Accel-Buffering": "no"}
+    )
 
 
 @node.route('/transaction', methods=['POST'])
@@ -310,8 +958,9 @@ def submit_transaction():
         # 验证交易格式
         tx = Transaction.from_dict(tx_data)
         
-        # 初步验证
-        validator = TransactionValidator(BLOCKCHAIN)
+        # 初步验证（记录验证时的链高度，挖矿时链未变化就不必重复验证）
+        validated_at_height = len(BLOCKCHAIN)
+        validator = TransactionValidator(BLOCKCHAIN, utxo_manager=CHAIN_UTXO_MANAGER)
         is_valid, error_msg = validator.validate_transaction(tx)
         
         if not is_valid:
@@ -321,7 +970,7 @@ def submit_transaction():
             }), 400
         
         # 添加到待处理队列
-        NODE_PENDING_TRANSACTIONS.append(tx_data)
+        NODE_PENDING_TRANSACTIONS.put((tx_data, validated_at_height))
         
         print(f"✓ 收到新交易: {tx.tx_type}")
         print(f"  交易ID: {tx.txid}")
@@ -360,11 +1009,12 @@ def get_utxos(address=None):
                 "message": "缺少 address 参数"
             }), 400
         
-        # 使用基于区块扫描的UTXO管理器
-        utxo_manager = BlockchainUTXOManager(BLOCKCHAIN)
-        utxos = utxo_manager.get_utxos_by_address(address, scan_months=3)
-        balance = utxo_manager.get_balance(address, scan_months=3)
-        copyright_utxos = utxo_manager.get_copyright_utxos(address, scan_months=3)
+        # 与交易验证使用同一个时间窗口（最近3个月）：钱包看到的UTXO都可以花费
+        now = int(time.time())  # UTXO列表和余额使用同一个时间窗口
+        utxos = CHAIN_UTXO_MANAGER.get_utxos_by_address(address, scan_months=3, now=now)
+        # 余额由管理器按地址缓存，钱包反复轮询同一地址时不再重新求和
+        balance = CHAIN_UTXO_MANAGER.get_balance(address, scan_months=3, now=now)
+        copyright_utxos = [utxo for utxo in utxos if utxo.utxo_type == "copyright"]
         
         return jsonify({
             "success": True,
@@ -416,7 +1066,7 @@ def faucet():
         )
         
         # 添加到待处理队列
-        NODE_PENDING_TRANSACTIONS.append(faucet_tx.to_dict())
+        NODE_PENDING_TRANSACTIONS.put((faucet_tx.to_dict(), None))
         
         return jsonify({
             "success": True,
@@ -439,15 +1089,8 @@ def query_copyright(work_hash):
     通过作品哈希查询版权UTXO
     """
     try:
-        # 通过扫描区块查找匹配的版权UTXO
-        utxo_manager = BlockchainUTXOManager(BLOCKCHAIN)
-        all_copyright_utxos = utxo_manager.scan_blockchain()
-        
-        copyright_utxos = []
-        for utxo in all_copyright_utxos.values():
-            if utxo.utxo_type == "copyright":
-                if utxo.payload and utxo.payload.get("work_hash") == work_hash:
-                    copyright_utxos.append(utxo.to_dict())
+        # 通过作品哈希索引查找版权UTXO
+        copyright_utxos = [utxo.to_dict() for utxo in get_work_copyright_utxos(work_hash)]
         
         if len(copyright_utxos) == 0:
             return jsonify({
@@ -474,9 +1117,9 @@ def get_status():
     return jsonify({
         "success": True,
         "blockchain_height": len(BLOCKCHAIN),
-        "pending_transactions": len(NODE_PENDING_TRANSACTIONS),
+        "pending_transactions": NODE_PENDING_TRANSACTIONS.qsize(),
         "miner_address": MINER_ADDRESS,
-        "note": "UTXO状态通过扫描区块重建，不维护全局UTXO池"
+        "note": "UTXO集合随新区块增量更新，可随时通过扫描区块重建"
     })
 
 
@@ -499,6 +1142,7 @@ def welcome_msg():
 
 
 if __name__ == '__main__':
+    init_blockchain()
     welcome_msg()
     
     # 启动后台挖矿线程
@@ -3,23 +3,161 @@
 支持版权注册、授权管理等功能
 """
 
+import argparse
+import asyncio
 import requests
 import time
 import base64
 import ecdsa
-import json
+import orjson
 import hashlib
 import os
-from typing import Optional, List, Dict
+import inspect
+import shlex
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, List, Dict, Tuple, Union
 from urllib.parse import quote
 
-from utxo import CopyrightPayload, TimeLockScript
-from transaction import Transaction, TransactionInput, TransactionOutput
+# aiohttp 用于并发查询多个地址的UTXO；未安装时退回线程池 + requests
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# coincurve 封装了 libsecp256k1（C实现），签名比纯Python的ecdsa快一个数量级；未安装时退回ecdsa
+try:
+    from coincurve import PrivateKey
+except ImportError:
+    PrivateKey = None
+
+from utxo import CopyrightPayload, TimeLockScript, COIN, to_sats
+from transaction import Transaction, TransactionInput, TransactionOutput, AuthMetadata
 
 
 # CPC节点URL
 NODE_URL = "http://localhost:5001"
 
+# 钱包本地缓存 /utxo 查询结果的秒数
+UTXO_CACHE_TTL = 2.0
+
+
+def _sha256_file(path: str) -> str:
+    """
+    流式计算文件的SHA-256（十六进制）
+    
+    作品文件可能是很大的音视频，不一次性读入内存；
+    Python 3.11+ 使用 hashlib.file_digest，否则按1 MiB分块更新
+    """
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+        return h.hexdigest()
+
+
+@lru_cache(maxsize=64)
+def _load_signing_key(private_key: str):
+    """
+    解析hex私钥为签名对象（coincurve.PrivateKey，未安装时为ecdsa.SigningKey）
+    
+    同一进程中反复加载同一个钱包（批量脚本、多个钱包对象）时只解析一次；
+    纯Python的ecdsa解析私钥需要一次椭圆曲线标量乘法，开销明显
+    """
+    if PrivateKey is not None:
+        return PrivateKey(bytes.fromhex(private_key))
+    return ecdsa.SigningKey.from_string(bytes.fromhex(private_key), curve=ecdsa.SECP256k1)
+
+
+def _work_hash_key(work_hash):
+    """
+    作品哈希的内部表示：32字节原始摘要
+    
+    JSON中仍然是64位十六进制字符串；无法解析的值原样返回
+    """
+    try:
+        return bytes.fromhex(work_hash)
+    except (ValueError, TypeError):
+        return work_hash
+
+
+def _change_amount(fuel_amount: float, *spent: float) -> float:
+    """
+    计算找零金额
+
+    先换算成整数聪再相减，避免 10.0 - 1.0 - 0.01 这类浮点误差（如 8.989999999999998）
+
+    Args:
+        fuel_amount: 燃料UTXO金额（CPC）
+        *spent: 需要扣除的各项金额（CPC）
+
+    Returns:
+        找零金额（CPC）
+    """
+    return (to_sats(fuel_amount) - sum(map(to_sats, spent))) / COIN
+
+
+def _write_tx_file(path: str, tx: Transaction):
+    """
+    保存待签名的多签交易文件
+    
+    先写入临时文件再用 os.replace 原子替换，另一方读取时不会读到写了一半的文件
+    """
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(orjson.dumps(tx.to_dict(), option=orjson.OPT_INDENT_2))
+    os.replace(tmp, path)
+
+
+def _make_activate_builder(address: str, public_key: str, proof_script: str):
+    """
+    生成授权激活交易（阶段三）的构建函数
+    
+    激活交易的结构固定：1个输入（授权指令UTXO）、1个输出（支付给自己的证明UTXO）。
+    地址、公钥和锁定脚本在这里一次性绑定，构建函数每次只需填入UTXO相关字段
+    
+    Args:
+        address: 钱包地址
+        public_key: 钱包公钥
+        proof_script: 支付给钱包地址的P2PKH锁定脚本
+        
+    Returns:
+        build(instruction_utxo, instruction_payload) -> Transaction
+    """
+    def build(instruction_utxo: Dict, instruction_payload: CopyrightPayload) -> Transaction:
+        payload = instruction_utxo["payload"]
+        inputs = [TransactionInput(
+            txid=instruction_utxo["txid"],
+            vout=instruction_utxo["vout"],
+            signature="",
+            public_key=public_key
+        )]
+        
+        # 输出：证明UTXO（继承instruction的created_at，授权期限固定为3个月）
+        proof_payload = CopyrightPayload(
+            work_hash=payload["work_hash"],
+            work_title=payload["work_title"],
+            author=payload["author"],
+            copyright_type="proof",
+            rights_scope=payload["rights_scope"]
+        )
+        proof_payload.created_at = instruction_payload.created_at
+        
+        # 简化设计：不需要赎回机制，到期后自动失效
+        outputs = [TransactionOutput(
+            amount=0.01,
+            address=address,
+            script_pubkey=proof_script,
+            utxo_type="copyright",
+            payload=proof_payload.to_dict()
+        )]
+        return Transaction(inputs, outputs, Transaction.TYPE_AUTH_ACTIVATE)
+    
+    return build
+
 
 class CPCWallet:
     """CPC钱包类"""
@@ -35,44 +173,133 @@ class CPCWallet:
         self.private_key = private_key
         self.public_key = public_key
         self.address = public_key  # 简化版本：公钥即地址
+        
+        # 复用同一个HTTP会话（keep-alive），各次请求不再重新建立TCP连接
+        self._session = requests.Session()
+        self._session.headers.update({"Content-Type": "application/json"})
+        
+        # /utxo 查询结果缓存：(余额, UTXO列表)
+        self._utxo_info = None
+        self._utxo_info_time = 0.0
+        self._utxo_index = None
+        
+        # P2PKH锁定脚本只与地址有关，每个地址只构造和序列化一次
+        self._script_cache: Dict[str, str] = {}
+        
+        # 授权激活交易的结构固定，预先绑定本钱包的地址、公钥和脚本
+        self._build_activate_tx = _make_activate_builder(
+            self.address, self.public_key, self._p2pkh_script_for(self.address)
+        )
+        
+        # 私钥只解析一次（同一私钥的多个钱包对象共用解析结果）
+        self._sk = _load_signing_key(private_key)
     
-    def get_balance(self) -> float:
-        """查询钱包余额"""
+    def _fetch_utxo_info(self, force: bool = False):
+        """
+        查询 /utxo，同时得到余额和UTXO列表
+        
+        结果缓存 UTXO_CACHE_TTL 秒，同一个操作流程中的多次查询只请求一次节点；
+        查询失败的结果不缓存
+        
+        Args:
+            force: 忽略缓存，强制重新查询
+            
+        Returns:
+            (余额, UTXO列表)
+        """
+        now = time.time()
+        if not force and self._utxo_info is not None and now - self._utxo_info_time < UTXO_CACHE_TTL:
+            return self._utxo_info
+        
         try:
             # 使用 query parameter 方式，避免 URL 路径中的特殊字符问题
-            response = requests.get(f"{NODE_URL}/utxo", params={"address": self.address})
+            response = self._session.get(f"{NODE_URL}/utxo", params={"address": self.address})
             if response.status_code == 200:
                 data = response.json()
-                return data.get("balance", 0)
+                self._utxo_info = (data.get("balance", 0), data.get("utxos", []))
+                self._utxo_info_time = now
+                return self._utxo_info
             else:
-                print("查询余额失败")
-                return 0
+                print("查询UTXO失败")
+                return 0, []
         except Exception as e:
             print(f"网络错误: {e}")
-            return 0
+            return 0, []
+    
+    def invalidate_utxos(self):
+        """清除UTXO缓存（提交交易后UTXO已经变化）"""
+        self._utxo_info = None
+        self._utxo_index = None
+    
+    def _p2pkh_script_for(self, address: str) -> str:
+        """获取支付到指定地址的P2PKH锁定脚本字符串（按地址缓存）"""
+        script = self._script_cache.get(address)
+        if script is None:
+            script = TimeLockScript(
+                script_type=TimeLockScript.SCRIPT_TYPE_P2PKH,
+                addresses=[address]
+            ).to_string()
+            self._script_cache[address] = script
+        return script
+    
+    def get_balance(self) -> float:
+        """查询钱包余额"""
+        return self._fetch_utxo_info()[0]
     
     def get_utxos(self) -> List[Dict]:
         """获取钱包的所有UTXO"""
-        try:
-            # 使用 query parameter 方式，避免 URL 路径中的特殊字符问题
-            response = requests.get(f"{NODE_URL}/utxo", params={"address": self.address})
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("utxos", [])
-            else:
-                return []
-        except Exception as e:
-            print(f"网络错误: {e}")
-            return []
+        return self._fetch_utxo_info()[1]
     
-    def sign_message(self, message: str) -> str:
-        """对消息签名"""
-        sk = ecdsa.SigningKey.from_string(
-            bytes.fromhex(self.private_key),
-            curve=ecdsa.SECP256k1
-        )
-        signature = sk.sign(message.encode())
-        return base64.b64encode(signature).decode()
+    def _index_utxos(self) -> Dict:
+        """
+        按类型为钱包UTXO建立索引
+        
+        同一份UTXO列表只建一次索引（与 /utxo 缓存同步失效），
+        之后的各种查找都是字典查询，不再逐个扫描列表
+        
+        Returns:
+            {
+                "fuel": [燃料UTXO, ...],
+                "outpoint": {(txid, vout): UTXO},
+                "copyright_<类型>": {work_hash原始字节: UTXO}
+            }
+        """
+        utxos = self.get_utxos()
+        if self._utxo_index is not None and self._utxo_index[0] is utxos:
+            return self._utxo_index[1]
+        
+        by_type = {"fuel": [], "outpoint": {}}
+        for u in utxos:
+            by_type["outpoint"][(u["txid"], u["vout"])] = u
+            if u["utxo_type"] == "fuel":
+                by_type["fuel"].append(u)
+            elif u["utxo_type"] == "copyright":
+                payload = u["payload"]
+                key = f"copyright_{payload.get('copyright_type')}"
+                by_type.setdefault(key, {})[_work_hash_key(payload.get("work_hash"))] = u
+        
+        self._utxo_index = (utxos, by_type)
+        return by_type
+    
+    def sign_message(self, message: str) -> bytes:
+        """
+        对消息签名，返回原始签名字节
+        
+        签名格式与 ecdsa.SigningKey.sign() 的默认输出一致（SHA-1摘要，64字节 r||s），
+        节点端的验证逻辑不需要区分签名来自哪个库
+        """
+        if PrivateKey is not None:
+            signature = self._sk.sign_recoverable(
+                message.encode(),
+                hasher=lambda m: hashlib.sha1(m).digest().rjust(32, b"\0")
+            )[:64]
+        else:
+            signature = self._sk.sign(message.encode())
+        return signature
+    
+    def sign_message_b64(self, message: str) -> str:
+        """对消息签名，返回base64字符串（直接写入JSON时使用）"""
+        return base64.b64encode(self.sign_message(message)).decode()
     
     # 注意：已移除用户间转账功能（send_cpc方法）
     # 原因：CPC是功能性凭证，只有矿工可以用CPC换取法币（需要身份证明）
@@ -89,25 +316,99 @@ class CPCWallet:
         Returns:
             交易ID或None
         """
+        # 先确认有燃料UTXO，再计算（可能很大的）作品文件哈希
+        fuel_utxo = self._pick_fuel_utxo()
+        if not fuel_utxo:
+            print("✗ 需要至少0.1 CPC作为燃料，请先使用水龙头获取")
+            return None
+        
         # 计算作品哈希
         try:
-            with open(work_file_path, 'rb') as f:
-                work_data = f.read()
-                work_hash = hashlib.sha256(work_data).hexdigest()
+            work_hash = _sha256_file(work_file_path)
         except Exception as e:
             print(f"✗ 读取文件失败: {e}")
             return None
         
+        return self._register_work_hash(work_hash, work_title, fuel_utxo=fuel_utxo)
+    
+    def register_copyrights(self, items: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """
+        批量注册版权（例如导入整个作品目录）
+        
+        所有作品文件先在线程池中并发计算哈希（hashlib在计算大块数据时会释放GIL），
+        再依次构建并提交注册交易；整个批次只查询一次UTXO，每笔交易使用不同的燃料UTXO
+        
+        Args:
+            items: [(作品文件路径, 作品标题), ...]
+            
+        Returns:
+            与items一一对应的交易ID列表，失败的项为None
+        """
+        def hash_file(path):
+            try:
+                return _sha256_file(path)
+            except Exception as e:
+                print(f"✗ 读取文件失败({path}): {e}")
+                return None
+        
+        # 燃料UTXO列表在批次开始时取一次：每笔交易提交成功后钱包会清除UTXO缓存，
+        # 逐笔调用 _pick_fuel_utxo 会为每个作品重新请求一次 /utxo
+        fuel_utxos = self._fuel_utxos()
+        if not fuel_utxos:
+            print("✗ 需要至少0.1 CPC作为燃料，请先使用水龙头获取")
+            return [None] * len(items)
+        
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+            hashes = list(pool.map(hash_file, [path for path, _ in items]))
+        
+        results = []
+        next_fuel = 0  # 本批次已花费（尚未打包）的燃料UTXO不再重复使用
+        for (_, work_title), work_hash in zip(items, hashes):
+            txid = None
+            if work_hash is not None:
+                if next_fuel < len(fuel_utxos):
+                    txid = self._register_work_hash(work_hash, work_title, fuel_utxos[next_fuel])
+                    if txid:
+                        next_fuel += 1
+                else:
+                    print(f"✗ 燃料UTXO不足，未注册: {work_title}")
+            results.append(txid)
+        return results
+    
+    def _fuel_utxos(self) -> List[Dict]:
+        """钱包中所有至少0.1 CPC的燃料UTXO"""
+        return [u for u in self._index_utxos()["fuel"] if u["amount"] >= 0.1]
+    
+    def _pick_fuel_utxo(self) -> Optional[Dict]:
+        """
+        选取一个至少0.1 CPC的燃料UTXO
+        
+        Returns:
+            燃料UTXO，没有则返回None
+        """
+        fuel_utxos = self._fuel_utxos()
+        return fuel_utxos[0] if fuel_utxos else None
+    
+    def _register_work_hash(self,
+                            work_hash: str,
+                            work_title: str,
+                            fuel_utxo: Optional[Dict] = None) -> Optional[str]:
+        """
+        构建并提交已知作品哈希的版权注册交易
+        
+        Args:
+            work_hash: 作品哈希
+            work_title: 作品标题
+            fuel_utxo: 已选好的燃料UTXO（为空时自动选取）
+            
+        Returns:
+            交易ID或None
+        """
         print(f"作品哈希: {work_hash}")
         
         # 获取燃料UTXO
-        utxos = self.get_utxos()
-        fuel_utxo = None
-        
-        for utxo in utxos:
-            if utxo["utxo_type"] == "fuel" and utxo["amount"] >= 0.1:
-                fuel_utxo = utxo
-                break
+        if fuel_utxo is None:
+            fuel_utxo = self._pick_fuel_utxo()
         
         if not fuel_utxo:
             print("✗ 需要至少0.1 CPC作为燃料，请先使用水龙头获取")
@@ -115,7 +416,6 @@ class CPCWallet:
         
         # 构建交易
         inputs = []
-        outputs = []
         
         # 输入：燃料UTXO
         tx_input = TransactionInput(
@@ -135,31 +435,23 @@ class CPCWallet:
             rights_scope=["复制权", "发行权", "改编权", "表演权", "放映权", "广播权"]
         )
         
-        copyright_script = TimeLockScript(
-            script_type=TimeLockScript.SCRIPT_TYPE_P2PKH,
-            addresses=[self.address]
-        ).to_string()
+        script = self._p2pkh_script_for(self.address)
         
-        outputs.append(TransactionOutput(
+        outputs = [TransactionOutput(
             amount=1.0,  # 版权主权UTXO固定1 CPC
             address=self.address,
-            script_pubkey=copyright_script,
+            script_pubkey=script,
             utxo_type="copyright",
             payload=copyright_payload.to_dict()
-        ))
+        )]
         
         # 输出2：找零
-        change = fuel_utxo["amount"] - 1.0 - 0.01  # 扣除版权UTXO和手续费
+        change = _change_amount(fuel_utxo["amount"], 1.0, 0.01)  # 扣除版权UTXO和手续费
         if change > 0:
-            change_script = TimeLockScript(
-                script_type=TimeLockScript.SCRIPT_TYPE_P2PKH,
-                addresses=[self.address]
-            ).to_string()
-            
             outputs.append(TransactionOutput(
                 amount=change,
                 address=self.address,
-                script_pubkey=change_script,
+                script_pubkey=script,
                 utxo_type="fuel"
             ))
         
@@ -171,9 +463,9 @@ class CPCWallet:
             metadata={"work_title": work_title}
         )
         
-        # 签名
+        # 签名（所有输入签的都是同一个txid，只需签名一次）
+        signature = self.sign_message(tx.txid)
         for inp in tx.inputs:
-            signature = self.sign_message(tx.txid)
             inp.signature = signature
             inp.add_signature(self.address, signature)
         
@@ -184,7 +476,8 @@ class CPCWallet:
                           work_hash: str,
                           licensee_address: str,
                           rights_scope: List[str],
-                          create_multisig: bool = True) -> Optional[str]:
+                          create_multisig: bool = True,
+                          save_file: bool = True) -> Union[str, Transaction, None]:
         """
         授权锁定（阶段二）
         支持多方签名：作者提供主权UTXO，公司提供燃料UTXO支付手续费
@@ -203,20 +496,15 @@ class CPCWallet:
             licensee_address: 被授权人地址
             rights_scope: 授权的权利范围
             create_multisig: 是否创建多签交易
+            save_file: 多签模式下是否保存为临时文件；为False时直接返回交易对象，
+                后续步骤可在内存中传递，不必反复读写文件
             
         Returns:
-            交易ID（单签）或临时文件名（多签）
+            交易ID（单签）、临时文件名（多签）或交易对象（多签且save_file=False）
         """
         # 查找版权主权UTXO（作者的）
-        utxos = self.get_utxos()
-        sovereignty_utxo = None
-        
-        for utxo in utxos:
-            if (utxo["utxo_type"] == "copyright" and 
-                utxo["payload"].get("copyright_type") == "sovereignty" and
-                utxo["payload"].get("work_hash") == work_hash):
-                sovereignty_utxo = utxo
-                break
+        idx = self._index_utxos()
+        sovereignty_utxo = idx.get("copyright_sovereignty", {}).get(_work_hash_key(work_hash))
         
         if not sovereignty_utxo:
             print("✗ 未找到该作品的版权主权UTXO")
@@ -226,11 +514,7 @@ class CPCWallet:
         # 在单签模式下，作者提供燃料
         if not create_multisig:
             # 查找燃料UTXO（作者的）
-            fuel_utxo = None
-            for utxo in utxos:
-                if utxo["utxo_type"] == "fuel" and utxo["amount"] >= 0.1:
-                    fuel_utxo = utxo
-                    break
+            fuel_utxo = next((u for u in idx["fuel"] if u["amount"] >= 0.1), None)
             
             if not fuel_utxo:
                 print("✗ 需要燃料UTXO用于支付手续费")
@@ -271,10 +555,7 @@ class CPCWallet:
             rights_scope=rights_scope
         )
         
-        instruction_script = TimeLockScript(
-            script_type=TimeLockScript.SCRIPT_TYPE_P2PKH,
-            addresses=[licensee_address]
-        ).to_string()
+        instruction_script = self._p2pkh_script_for(licensee_address)
         
         outputs.append(TransactionOutput(
             amount=0.04,
@@ -285,25 +566,19 @@ class CPCWallet:
         ))
         
         # 输出2：重新铸造版权主权UTXO给作者
-        sovereignty_payload = CopyrightPayload(
-            work_hash=work_hash,
-            work_title=sovereignty_utxo["payload"]["work_title"],
-            author=self.address,
-            copyright_type="sovereignty",
-            rights_scope=sovereignty_utxo["payload"]["rights_scope"]
-        )
+        # 内容与花费的主权UTXO相同，直接浅拷贝其payload，只更新作者和创建时间
+        sovereignty_payload = dict(sovereignty_utxo["payload"])
+        sovereignty_payload["author"] = self.address
+        sovereignty_payload["created_at"] = time.time()
         
-        sovereignty_script = TimeLockScript(
-            script_type=TimeLockScript.SCRIPT_TYPE_P2PKH,
-            addresses=[self.address]
-        ).to_string()
+        sovereignty_script = self._p2pkh_script_for(self.address)
         
         outputs.append(TransactionOutput(
             amount=1.0,
             address=self.address,
             script_pubkey=sovereignty_script,
             utxo_type="copyright",
-            payload=sovereignty_payload.to_dict()
+            payload=sovereignty_payload
         ))
         
         # 创建交易
@@ -311,29 +586,32 @@ class CPCWallet:
             inputs=inputs,
             outputs=outputs,
             tx_type=Transaction.TYPE_AUTH_LOCK,
-            metadata={
-                "licensee": licensee_address,
-                "multisig": create_multisig,
-                "author": self.address,
-                "note": "授权期限固定为3个月"
-            }
+            metadata=AuthMetadata(
+                licensee=licensee_address,
+                multisig=create_multisig,
+                author=self.address
+            ).to_dict()
         )
         
         # 作者签名自己的输入
-        author_signature = self.sign_message(tx.txid)
+        txid = tx.txid
+        author_signature = self.sign_message(txid)
         for i, inp in enumerate(tx.inputs):
             if self.address in inp.required_signers:
                 inp.add_signature(self.address, author_signature)
         
         # 如果是多签模式，保存交易供被授权人继续
-        if create_multisig:
+        if create_multisig and not save_file:
+            print(f"\n✓ 多签授权交易已创建（第一步）")
+            print(f"  交易ID: {txid[:16]}...")
+            return tx
+        elif create_multisig:
             # 保存临时交易文件
-            temp_tx_file = f"pending_auth_{tx.txid[:8]}.json"
-            with open(temp_tx_file, 'w', encoding='utf-8') as f:
-                json.dump(tx.to_dict(), f, indent=2, ensure_ascii=False)
+            temp_tx_file = f"pending_auth_{txid[:8]}.json"
+            _write_tx_file(temp_tx_file, tx)
             
             print(f"\n✓ 多签授权交易已创建（第一步）")
-            print(f"  交易ID: {tx.txid[:16]}...")
+            print(f"  交易ID: {txid[:16]}...")
             print(f"  临时文件: {temp_tx_file}")
             print(f"\n📝 请将以下信息发送给被授权人({licensee_address}):")
             print(f"  1. 临时文件: {temp_tx_file}")
@@ -348,7 +626,7 @@ class CPCWallet:
             # 单签模式：直接提交
             if fuel_utxo:
                 # 添加找零输出
-                change = fuel_utxo["amount"] - 0.04 - 0.01  # 0.01手续费
+                change = _change_amount(fuel_utxo["amount"], 0.04, 0.01)  # 0.01手续费
                 if change > 0:
                     outputs.append(TransactionOutput(
                         amount=change,
@@ -359,29 +637,47 @@ class CPCWallet:
             
             return self._submit_transaction(tx, "授权锁定（单签）")
     
-    def sign_pending_transaction(self, tx_file: str) -> Optional[str]:
+    @staticmethod
+    def _load_pending_transaction(tx_file: Union[str, Transaction]) -> Tuple[Optional[Transaction], Optional[str]]:
         """
-        签名待签交易
-        用于多签场景中，第二个签名者签名交易
+        读取待签的多签交易
         
         Args:
-            tx_file: 临时交易文件路径
+            tx_file: 临时交易文件路径，或内存中的交易对象
             
         Returns:
-            交易ID（如果完全签名）或None
+            (交易对象, 文件路径)；传入交易对象时文件路径为None，读取失败时交易对象为None
         """
+        if isinstance(tx_file, Transaction):
+            return tx_file, None
+        
         try:
-            with open(tx_file, 'r', encoding='utf-8') as f:
-                tx_dict = json.load(f)
+            with open(tx_file, 'rb') as f:
+                tx_dict = orjson.loads(f.read())
         except FileNotFoundError:
             print(f"✗ 文件不存在: {tx_file}")
-            return None
+            return None, tx_file
         except Exception as e:
             print(f"✗ 读取交易文件失败: {e}")
-            return None
+            return None, tx_file
         
         # 从字典重建交易对象
-        tx = Transaction.from_dict(tx_dict)
+        return Transaction.from_dict(tx_dict), tx_file
+    
+    def sign_pending_transaction(self, tx_file: Union[str, Transaction]) -> Optional[str]:
+        """
+        签名待签交易
+        用于多签场景中，第二个签名者签名交易
+        
+        Args:
+            tx_file: 临时交易文件路径，或内存中的交易对象（签名直接写入该对象）
+            
+        Returns:
+            交易ID（如果完全签名）或None
+        """
+        tx, tx_file = self._load_pending_transaction(tx_file)
+        if tx is None:
+            return None
         
         # 找出需要当前钱包签名的输入
         unsigned_signers = tx.get_unsigned_signers()
@@ -394,7 +690,7 @@ class CPCWallet:
         
         inputs_to_sign = []
         for i, inp in enumerate(tx.inputs):
-            if wallet_address in inp.required_signers and wallet_address not in inp.signatures:
+            if wallet_address in inp.get_unsigned_signers():
                 inputs_to_sign.append(i)
         
         if not inputs_to_sign:
@@ -415,66 +711,56 @@ class CPCWallet:
             print(f"\n✅ 交易已完全签名，可以提交")
             result = self._submit_transaction(tx, "完全签名的授权交易")
             # 删除临时文件
-            try:
-                os.remove(tx_file)
-            except:
-                pass
+            if tx_file:
+                try:
+                    os.remove(tx_file)
+                except:
+                    pass
             return result
         else:
-            # 保存更新的交易文件
-            with open(tx_file, 'w', encoding='utf-8') as f:
-                json.dump(tx.to_dict(), f, indent=2, ensure_ascii=False)
-            
             unsigned = tx.get_unsigned_signers()
             print(f"\n⏳ 交易仍需签名，等待以下地址签名:")
             for inp_idx, addrs in unsigned:
                 print(f"  输入{inp_idx+1}: {addrs}")
-            print(f"\n📝 交易已保存，等待其他签名者操作: {tx_file}")
+            
+            if tx_file:
+                # 保存更新的交易文件
+                _write_tx_file(tx_file, tx)
+                print(f"\n📝 交易已保存，等待其他签名者操作: {tx_file}")
             return None
     
-    def prepare_multisig_authorization(self, tx_file: str) -> Optional[str]:
+    def prepare_multisig_authorization(self, tx_file: Union[str, Transaction]) -> Union[str, Transaction, None]:
         """
         为多签授权交易添加被授权人的燃料UTXO
         这是被授权人在第一步接收交易后需要执行的操作
         
         Args:
-            tx_file: 临时交易文件路径
+            tx_file: 临时交易文件路径，或内存中的交易对象（直接在该对象上修改）
             
         Returns:
-            更新后的文件路径，或None if失败
+            更新后的文件路径（传入交易对象时返回该对象），或None if失败
         """
         # 读取交易文件
-        try:
-            with open(tx_file, 'r', encoding='utf-8') as f:
-                tx_dict = json.load(f)
-        except FileNotFoundError:
-            print(f"✗ 文件不存在: {tx_file}")
-            return None
-        except Exception as e:
-            print(f"✗ 读取交易文件失败: {e}")
+        tx, tx_file = self._load_pending_transaction(tx_file)
+        if tx is None:
             return None
         
-        # 从字典重建交易对象
-        tx = Transaction.from_dict(tx_dict)
+        auth_meta = AuthMetadata.from_dict(tx.metadata)
         
         # 检查这是否是多签授权交易
-        if not tx.metadata.get("multisig"):
+        if not auth_meta.multisig:
             print("✗ 这不是一个多签授权交易")
             return None
         
         # 检查当前钱包是否是被授权人
-        licensee = tx.metadata.get("licensee")
+        licensee = auth_meta.licensee
         if self.address != licensee:
             print(f"✗ 当前钱包({self.address})不是被授权人({licensee})")
             return None
         
         # 查找被授权人的燃料UTXO
-        utxos = self.get_utxos()
-        fuel_utxo = None
-        for utxo in utxos:
-            if utxo["utxo_type"] == "fuel" and utxo["amount"] >= 0.1:
-                fuel_utxo = utxo
-                break
+        idx = self._index_utxos()
+        fuel_utxo = next((u for u in idx["fuel"] if u["amount"] >= 0.1), None)
         
         if not fuel_utxo:
             print("✗ 当前钱包中没有足够的燃料UTXO（需要至少0.1 CPC）")
@@ -501,19 +787,16 @@ class CPCWallet:
             else:
                 out_address = out.get("address")
                 out_script = out.get("script_pubkey")
-            if out_address == tx.metadata.get("author"):
+            if out_address == auth_meta.author:
                 author_script = out_script
                 break
         
         if not author_script:
             # 如果找不到，使用被授权人的脚本
-            author_script = TimeLockScript(
-                script_type=TimeLockScript.SCRIPT_TYPE_P2PKH,
-                addresses=[self.address]
-            ).to_string()
+            author_script = self._p2pkh_script_for(self.address)
         
         # 被授权人支付授权指令金额(0.04) + 手续费(0.01)
-        change = fuel_utxo["amount"] - 0.04 - 0.01
+        change = _change_amount(fuel_utxo["amount"], 0.04, 0.01)
         if change > 0:
             outputs.append(TransactionOutput(
                 amount=change,
@@ -522,19 +805,79 @@ class CPCWallet:
                 utxo_type="fuel"
             ))
         
-        # 保存更新的交易
-        with open(tx_file, 'w', encoding='utf-8') as f:
-            json.dump(tx.to_dict(), f, indent=2, ensure_ascii=False)
-        
         print(f"✓ 已添加被授权人的燃料UTXO")
         print(f"  燃料数量: {fuel_utxo['amount']} CPC")
         print(f"  手续费: 0.01 CPC")
         print(f"  找零: {change:.4f} CPC")
+        
+        if not tx_file:
+            return tx
+        
+        # 保存更新的交易
+        _write_tx_file(tx_file, tx)
         print(f"\n✅ 交易已更新，可以进行签名")
         print(f"  请调用: sign_pending_transaction('{tx_file}')")
         
         return tx_file
     
+    @staticmethod
+    def describe_multisig(tx_file: Union[str, Transaction]) -> bool:
+        """
+        打印多签交易的签名状态
+        
+        Args:
+            tx_file: 临时交易文件路径，或内存中的交易对象
+            
+        Returns:
+            是否成功读取交易
+        """
+        tx, _ = CPCWallet._load_pending_transaction(tx_file)
+        if tx is None:
+            return False
+        
+        print(f"\n📋 交易状态:")
+        print(f"  交易ID: {tx.txid[:16]}...")
+        print(f"  输入数: {len(tx.inputs)}")
+        for i, inp in enumerate(tx.inputs):
+            status = "已签名" if inp.is_fully_signed() else "未签名"
+            print(f"    输入{i+1}: 需要{inp.required_signers} | {status}")
+        return True
+    
+    def prepare_and_sign_multisig(self, tx_file: Union[str, Transaction]) -> Optional[str]:
+        """
+        被授权人一步完成：添加燃料UTXO并签名
+        
+        相当于依次调用 prepare_multisig_authorization 和 sign_pending_transaction，
+        但交易只读取一次、在内存中完成修改和签名，最后才写回文件（或直接提交）
+        
+        Args:
+            tx_file: 临时交易文件路径，或内存中的交易对象
+            
+        Returns:
+            交易ID（如果完全签名并提交）或None
+        """
+        tx, tx_file = self._load_pending_transaction(tx_file)
+        if tx is None:
+            return None
+        
+        if not self.prepare_multisig_authorization(tx):
+            return None
+        
+        result = self.sign_pending_transaction(tx)
+        
+        if tx_file:
+            if tx.is_fully_signed():
+                # 已提交，删除临时文件
+                try:
+                    os.remove(tx_file)
+                except:
+                    pass
+            else:
+                # 仍需其他人签名，保存更新后的交易
+                _write_tx_file(tx_file, tx)
+                print(f"\n📝 交易已保存，等待其他签名者操作: {tx_file}")
+        return result
+    
     def activate_authorization(self, instruction_txid: str, instruction_vout: int) -> Optional[str]:
         """
         激活授权（阶段三）
@@ -548,71 +891,27 @@ class CPCWallet:
             交易ID或None
         """
         # 查找授权指令UTXO
-        utxos = self.get_utxos()
-        instruction_utxo = None
-        
-        for utxo in utxos:
-            if (utxo["txid"] == instruction_txid and 
-                utxo["vout"] == instruction_vout and
-                utxo["utxo_type"] == "copyright" and
-                utxo["payload"].get("copyright_type") == "instruction"):
-                instruction_utxo = utxo
-                break
+        instruction_utxo = self._index_utxos()["outpoint"].get((instruction_txid, instruction_vout))
+        if instruction_utxo and (instruction_utxo["utxo_type"] != "copyright" or
+                                 instruction_utxo["payload"].get("copyright_type") != "instruction"):
+            instruction_utxo = None
         
         if not instruction_utxo:
             print("✗ 未找到授权指令UTXO")
             return None
         
         # 检查授权是否已过期（动态计算，固定3个月）
-        from utxo import CopyrightPayload
         instruction_payload = CopyrightPayload.from_dict(instruction_utxo["payload"])
         if instruction_payload.is_expired():
             print(f"✗ 授权已过期（授权期限固定为3个月）")
             return None
         
-        # 构建交易
-        inputs = [TransactionInput(
-            txid=instruction_utxo["txid"],
-            vout=instruction_utxo["vout"],
-            signature="",
-            public_key=self.public_key
-        )]
-        
-        # 输出：证明UTXO（继承instruction的created_at，授权期限固定为3个月）
-        proof_payload = CopyrightPayload(
-            work_hash=instruction_utxo["payload"]["work_hash"],
-            work_title=instruction_utxo["payload"]["work_title"],
-            author=instruction_utxo["payload"]["author"],
-            copyright_type="proof",
-            rights_scope=instruction_utxo["payload"]["rights_scope"]
-        )
-        # 继承instruction的created_at（授权期限从instruction创建时开始计算）
-        proof_payload.created_at = instruction_payload.created_at
-        
-        # 简化设计：不需要赎回机制，到期后自动失效
-        proof_script = TimeLockScript(
-            script_type=TimeLockScript.SCRIPT_TYPE_P2PKH,
-            addresses=[self.address]
-        ).to_string()
-        
-        outputs = [TransactionOutput(
-            amount=0.01,
-            address=self.address,
-            script_pubkey=proof_script,
-            utxo_type="copyright",
-            payload=proof_payload.to_dict()
-        )]
-        
-        # 创建交易
-        tx = Transaction(
-            inputs=inputs,
-            outputs=outputs,
-            tx_type=Transaction.TYPE_AUTH_ACTIVATE
-        )
+        # 构建交易（交易结构固定，由钱包初始化时生成的构建函数完成）
+        tx = self._build_activate_tx(instruction_utxo, instruction_payload)
         
-        # 签名
+        # 签名（所有输入签的都是同一个txid，只需签名一次）
+        signature = self.sign_message(tx.txid)
         for inp in tx.inputs:
-            signature = self.sign_message(tx.txid)
             inp.signature = signature
             inp.add_signature(self.address, signature)
         
@@ -621,15 +920,16 @@ class CPCWallet:
     def _submit_transaction(self, tx: Transaction, operation_name: str) -> Optional[str]:
         """提交交易的通用方法"""
         try:
-            response = requests.post(
+            # 直接发送交易已缓存的规范JSON字节，不再由requests重新序列化 to_dict()
+            response = self._session.post(
                 f"{NODE_URL}/transaction",
-                json=tx.to_dict(),
-                headers={"Content-Type": "application/json"}
+                data=tx.canonical_bytes()
             )
             
             if response.status_code == 200:
                 result = response.json()
                 if result.get("success"):
+                    self.invalidate_utxos()
                     print(f"✓ {operation_name}交易提交成功！")
                     print(f"  交易ID: {result.get('txid')}")
                     return result.get('txid')
@@ -645,19 +945,99 @@ class CPCWallet:
             return None
 
 
+# ============ 批量查询 ============
+
+# 批量查询时同时进行的请求数上限
+BULK_QUERY_CONCURRENCY = 16
+
+
+async def _aget_utxo_info(session, address: str) -> List[Dict]:
+    """异步查询单个地址的UTXO列表，失败返回空列表"""
+    try:
+        async with session.get(f"{NODE_URL}/utxo", params={"address": address}) as response:
+            if response.status == 200:
+                data = await response.json()
+                return data.get("utxos", [])
+    except Exception as e:
+        print(f"网络错误({address[:16]}...): {e}")
+    return []
+
+
+async def _gather_utxos(addresses: List[str]) -> List[List[Dict]]:
+    """共用一个连接池并发查询所有地址"""
+    connector = aiohttp.TCPConnector(limit=BULK_QUERY_CONCURRENCY)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        return await asyncio.gather(*(_aget_utxo_info(session, addr) for addr in addresses))
+
+
+def _get_utxos_threaded(addresses: List[str]) -> List[List[Dict]]:
+    """未安装aiohttp时的退路：线程池 + 共享的requests会话"""
+    def fetch(address):
+        try:
+            response = session.get(f"{NODE_URL}/utxo", params={"address": address})
+            if response.status_code == 200:
+                return response.json().get("utxos", [])
+        except Exception as e:
+            print(f"网络错误({address[:16]}...): {e}")
+        return []
+    
+    with requests.Session() as session, \
+            ThreadPoolExecutor(max_workers=min(BULK_QUERY_CONCURRENCY, len(addresses))) as pool:
+        return list(pool.map(fetch, addresses))
+
+
+def get_utxos_bulk(addresses: List[str]) -> Dict[str, List[Dict]]:
+    """
+    并发查询多个地址的UTXO
+    
+    逐个调用 CPCWallet.get_utxos() 的总耗时是各次请求延迟之和，
+    并发查询的耗时约等于最慢的一次请求
+    
+    Args:
+        addresses: 地址列表
+        
+    Returns:
+        {地址: UTXO列表}，查询失败的地址对应空列表
+    """
+    addresses = list(dict.fromkeys(addresses))
+    if not addresses:
+        return {}
+    
+    if aiohttp is not None:
+        results = asyncio.run(_gather_utxos(addresses))
+    else:
+        results = _get_utxos_threaded(addresses)
+    return dict(zip(addresses, results))
+
+
 # ============ 命令行交互界面 ============
 
+def generate_keypair() -> Tuple[str, str]:
+    """
+    生成新的密钥对（公钥为未压缩格式去掉0x04前缀的64字节）
+    
+    Returns:
+        (私钥hex, 公钥base64)，可直接传给 CPCWallet
+    """
+    if PrivateKey is not None:
+        sk = PrivateKey()
+        private_key = sk.secret.hex()
+        public_key = base64.b64encode(sk.public_key.format(compressed=False)[1:]).decode()
+    else:
+        sk = ecdsa.SigningKey.generate(curve=ecdsa.SECP256k1)
+        private_key = sk.to_string().hex()
+        vk = sk.get_verifying_key()
+        public_key = base64.b64encode(vk.to_string()).decode()
+    return private_key, public_key
+
+
 def generate_wallet():
     """生成新钱包"""
     print("\n" + "="*50)
     print("生成新的CPC钱包")
     print("="*50)
     
-    # 生成密钥对
-    sk = ecdsa.SigningKey.generate(curve=ecdsa.SECP256k1)
-    private_key = sk.to_string().hex()
-    vk = sk.get_verifying_key()
-    public_key = base64.b64encode(vk.to_string()).decode()
+    private_key, public_key = generate_keypair()
     
     # 保存到文件
     filename = input("\n钱包文件名（不含后缀）: ") + ".json"
@@ -668,8 +1048,8 @@ def generate_wallet():
         "address": public_key
     }
     
-    with open(filename, "w") as f:
-        json.dump(wallet_data, f, indent=2)
+    with open(filename, "wb") as f:
+        f.write(orjson.dumps(wallet_data, option=orjson.OPT_INDENT_2))
     
     print(f"\n✓ 钱包已保存到 {filename}")
     print(f"\n地址: {public_key}")
@@ -677,13 +1057,19 @@ def generate_wallet():
     print("="*50)
 
 
-def load_wallet() -> Optional[CPCWallet]:
-    """加载钱包"""
-    filename = input("\n钱包文件名: ")
+def load_wallet(filename: Optional[str] = None) -> Optional[CPCWallet]:
+    """
+    加载钱包
+    
+    Args:
+        filename: 钱包文件名（为空时交互输入）
+    """
+    if filename is None:
+        filename = input("\n钱包文件名: ")
     
     try:
-        with open(filename, "r") as f:
-            wallet_data = json.load(f)
+        with open(filename, "rb") as f:
+            wallet_data = orjson.loads(f.read())
         
         return CPCWallet(
             private_key=wallet_data["private_key"],
@@ -694,22 +1080,29 @@ def load_wallet() -> Optional[CPCWallet]:
         return None
 
 
-def request_faucet(wallet: CPCWallet):
-    """从水龙头领取CPC"""
+def request_faucet(wallet: CPCWallet) -> Optional[str]:
+    """
+    从水龙头领取CPC
+    
+    Returns:
+        水龙头交易ID，失败时为None
+    """
     print("\n" + "="*50)
     print("从水龙头领取CPC")
     print("="*50)
     
+    txid = None
     try:
-        response = requests.post(
+        response = wallet._session.post(
             f"{NODE_URL}/faucet",
-            json={"address": wallet.address},
-            headers={"Content-Type": "application/json"}
+            json={"address": wallet.address}
         )
         
         if response.status_code == 200:
             result = response.json()
             if result.get("success"):
+                wallet.invalidate_utxos()
+                txid = result.get("txid")
                 print(f"\n✓ 领取成功！")
                 print(f"  数量: {result.get('amount')} CPC")
                 print(f"  交易ID: {result.get('txid')}")
@@ -722,9 +1115,172 @@ def request_faucet(wallet: CPCWallet):
         print(f"\n✗ 网络错误: {e}")
     
     print("="*50)
+    return txid
+
+
+def _convert_script_args(method, args: List[str]) -> List:
+    """按方法参数的类型注解转换脚本中的字符串参数（int、bool、List[str]）"""
+    params = list(inspect.signature(method).parameters.values())
+    converted = []
+    for param, arg in zip(params, args):
+        if param.annotation is int:
+            arg = int(arg)
+        elif param.annotation is bool:
+            arg = arg.lower() in ("1", "true", "yes", "y")
+        elif param.annotation == List[str]:
+            arg = [item.strip() for item in arg.split(",") if item.strip()]
+        converted.append(arg)
+    return converted + args[len(params):]
+
+
+def run_script(wallet: CPCWallet, script_path: str) -> List:
+    """
+    批量执行命令文件
+    
+    每行一条命令：`方法名 参数1 参数2 ...`（shell式引号，# 开头为注释），
+    方法名为 CPCWallet 的公有方法，另外支持 `faucet` 领取水龙头。
+    整个批次复用同一个钱包、HTTP会话和UTXO缓存；
+    连续的 register_copyright 命令合并为一次 register_copyrights 调用，
+    只查询一次UTXO并为每个作品使用不同的燃料UTXO
+    
+    Args:
+        wallet: 已加载的钱包
+        script_path: 命令文件路径
+        
+    Returns:
+        各条命令的返回值
+    """
+    with open(script_path, "r", encoding="utf-8") as f:
+        commands = [shlex.split(line, comments=True) for line in f]
+    commands = [cmd for cmd in commands if cmd]
+    
+    results = []
+    registrations = []
+    
+    def flush_registrations():
+        if registrations:
+            results.extend(wallet.register_copyrights(registrations))
+            registrations.clear()
+    
+    for lineno, (name, *args) in enumerate(commands, 1):
+        if name == "register_copyright" and len(args) == 2:
+            registrations.append((args[0], args[1]))
+            continue
+        flush_registrations()
+        
+        if name == "faucet":
+            results.append(request_faucet(wallet))
+            continue
+        
+        method = getattr(wallet, name, None) if not name.startswith("_") else None
+        if not callable(method):
+            print(f"✗ 第{lineno}条命令无效: {name}")
+            results.append(None)
+            continue
+        
+        try:
+            results.append(method(*_convert_script_args(method, args)))
+        except Exception as e:
+            print(f"✗ 第{lineno}条命令执行失败: {e}")
+            results.append(None)
+    
+    flush_registrations()
+    return results
+
+
+def _menu_generate(wallet):
+    generate_wallet()
+    return wallet
+
+
+def _menu_load(wallet):
+    wallet = load_wallet()
+    if wallet:
+        print(f"\n✓ 钱包加载成功！")
+        print(f"地址: {wallet.address}")
+    return wallet
+
+
+def _menu_balance(wallet):
+    balance = wallet.get_balance()
+    print(f"\n余额: {balance} CPC")
+    return wallet
+
+
+def _menu_faucet(wallet):
+    request_faucet(wallet)
+    return wallet
+
+
+def _menu_register(wallet):
+    work_file = input("作品文件路径: ")
+    work_title = input("作品标题: ")
+    wallet.register_copyright(work_file, work_title)
+    return wallet
 
 
-def main_menu():
+def _menu_lock(wallet):
+    work_hash = input("作品哈希: ")
+    licensee = input("被授权人地址: ")
+    
+    print("授权权利范围（逗号分隔）: ")
+    rights = input("例如：复制权,发行权,改编权\n").split(",")
+    rights = [r.strip() for r in rights]
+    
+    # 注意：授权期限固定为3个月，从UTXO创建时间开始计算
+    print("ℹ️  授权期限固定为3个月")
+    wallet.lock_authorization(work_hash, licensee, rights)
+    return wallet
+
+
+def _menu_activate(wallet):
+    txid = input("授权指令UTXO的交易ID: ")
+    vout = int(input("输出索引: "))
+    wallet.activate_authorization(txid, vout)
+    return wallet
+
+
+def _menu_list_utxos(wallet):
+    utxos = wallet.get_utxos()
+    print(f"\n共有 {len(utxos)} 个UTXO:")
+    for utxo in utxos:
+        print(f"\n  {utxo['txid']}:{utxo['vout']}")
+        print(f"  类型: {utxo['utxo_type']}")
+        print(f"  数量: {utxo['amount']} CPC")
+        if utxo['utxo_type'] == 'copyright':
+            print(f"  版权类型: {utxo['payload'].get('copyright_type')}")
+            print(f"  作品: {utxo['payload'].get('work_title')}")
+    return wallet
+
+
+def _menu_prepare_multisig(wallet):
+    tx_file = input("输入作者提供的多签交易文件路径: ").strip()
+    wallet.prepare_multisig_authorization(tx_file)
+    return wallet
+
+
+def _menu_sign_pending(wallet):
+    tx_file = input("输入需要签名的多签交易文件路径: ").strip()
+    wallet.sign_pending_transaction(tx_file)
+    return wallet
+
+
+# 菜单选项 -> (是否需要已加载的钱包, 处理函数)；处理函数接收当前钱包并返回（可能新加载的）钱包
+MENU_ACTIONS = {
+    "1": (False, _menu_generate),
+    "2": (False, _menu_load),
+    "3": (True, _menu_balance),
+    "4": (True, _menu_faucet),
+    "5": (True, _menu_register),
+    "6": (True, _menu_lock),
+    "7": (True, _menu_activate),
+    "8": (True, _menu_list_utxos),
+    "9": (True, _menu_prepare_multisig),
+    "10": (True, _menu_sign_pending),
+}
+
+
+def main_menu(wallet: Optional[CPCWallet] = None):
     """主菜单"""
     print("""
     =========================================
@@ -733,8 +1289,6 @@ def main_menu():
     =========================================
     """)
     
-    wallet = None
-    
     while True:
         print("\n请选择操作：")
         print("1. 生成新钱包")
@@ -752,60 +1306,28 @@ def main_menu():
         
         choice = input("\n请输入选项: ").strip()
         
-        if choice == "1":
-            generate_wallet()
-        elif choice == "2":
-            wallet = load_wallet()
-            if wallet:
-                print(f"\n✓ 钱包加载成功！")
-                print(f"地址: {wallet.address}")
-        elif choice == "3" and wallet:
-            balance = wallet.get_balance()
-            print(f"\n余额: {balance} CPC")
-        elif choice == "4" and wallet:
-            request_faucet(wallet)
-        elif choice == "5" and wallet:
-            work_file = input("作品文件路径: ")
-            work_title = input("作品标题: ")
-            wallet.register_copyright(work_file, work_title)
-        elif choice == "6" and wallet:
-            work_hash = input("作品哈希: ")
-            licensee = input("被授权人地址: ")
-            
-            print("授权权利范围（逗号分隔）: ")
-            rights = input("例如：复制权,发行权,改编权\n").split(",")
-            rights = [r.strip() for r in rights]
-            
-            # 注意：授权期限固定为3个月，从UTXO创建时间开始计算
-            print("ℹ️  授权期限固定为3个月")
-            wallet.lock_authorization(work_hash, licensee, rights)
-        elif choice == "7" and wallet:
-            txid = input("授权指令UTXO的交易ID: ")
-            vout = int(input("输出索引: "))
-            wallet.activate_authorization(txid, vout)
-        elif choice == "8" and wallet:
-            utxos = wallet.get_utxos()
-            print(f"\n共有 {len(utxos)} 个UTXO:")
-            for utxo in utxos:
-                print(f"\n  {utxo['txid']}:{utxo['vout']}")
-                print(f"  类型: {utxo['utxo_type']}")
-                print(f"  数量: {utxo['amount']} CPC")
-                if utxo['utxo_type'] == 'copyright':
-                    print(f"  版权类型: {utxo['payload'].get('copyright_type')}")
-                    print(f"  作品: {utxo['payload'].get('work_title')}")
-        elif choice == "9" and wallet:
-            tx_file = input("输入作者提供的多签交易文件路径: ").strip()
-            wallet.prepare_multisig_authorization(tx_file)
-        elif choice == "10" and wallet:
-            tx_file = input("输入需要签名的多签交易文件路径: ").strip()
-            wallet.sign_pending_transaction(tx_file)
-        elif choice == "0":
+        if choice == "0":
             print("\n再见！")
             break
+        
+        entry = MENU_ACTIONS.get(choice)
+        if entry and (wallet or not entry[0]):
+            wallet = entry[1](wallet)
         else:
             print("\n无效选项")
 
 
 if __name__ == '__main__':
-    main_menu()
+    parser = argparse.ArgumentParser(description="时权链 CPC 钱包")
+    parser.add_argument("--wallet", help="钱包文件")
+    parser.add_argument("--script", help="批量执行的命令文件（需要同时指定 --wallet）")
+    cli_args = parser.parse_args()
+    
+    cli_wallet = load_wallet(cli_args.wallet) if cli_args.wallet else None
+    if cli_args.script:
+        if not cli_wallet:
+            parser.error("--script 需要通过 --wallet 加载钱包")
+        run_script(cli_wallet, cli_args.script)
+    else:
+        main_menu(cli_wallet)
 
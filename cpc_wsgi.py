@@ -0,0 +1,23 @@
+"""
+时权链 (Time-Rights Chain) - 矿工节点的WSGI入口
+供 gunicorn 等生产环境服务器加载，替代 Flask 自带的开发服务器
+
+启动方式：
+    gunicorn -w 1 -k gthread --threads 8 -b 0.0.0.0:5001 cpc_wsgi:application
+
+只能使用一个worker进程：区块链和UTXO集合都保存在进程内存中，
+多个请求线程共享同一份状态
+"""
+
+import threading
+
+from cpc_miner import node, mine_loop, welcome_msg, init_blockchain
+
+init_blockchain()
+welcome_msg()
+
+# 在worker进程内启动后台挖矿线程
+mining_thread = threading.Thread(target=mine_loop, daemon=True)
+mining_thread.start()
+
+application = node
@@ -7,20 +7,36 @@ import time
 import hashlib
 import json
 import os
+import io
+import sys
 
 # 模拟演示，实际使用时需要启动矿工节点
 
-def print_section(title):
-    """打印章节标题"""
-    print("\n" + "="*60)
-    print(f"  {title}")
-    print("="*60 + "\n")
+# 演示输出先写入缓冲区，每个章节结束（等待回车）时一次性写到终端
+_output = io.StringIO()
 
 
-def demo_scenario():
-    """演示完整的版权授权场景"""
-    
-    print("""
+def emit(*args):
+    """输出一行演示文本（写入缓冲区）"""
+    print(*args, file=_output)
+
+
+def flush_output():
+    """把缓冲区中的演示文本一次性写出"""
+    sys.stdout.write(_output.getvalue())
+    sys.stdout.flush()
+    _output.seek(0)
+    _output.truncate()
+
+
+def wait_for_enter(prompt: str = "按回车继续..."):
+    """写出本章节的输出，然后等待用户按回车"""
+    flush_output()
+    input(prompt)
+
+
+# 固定不变的大段演示文本
+_INTRO_BANNER = """
     ╔══════════════════════════════════════════════════════════╗
     ║                                                          ║
     ║      时权链 (Time-Rights Chain) 完整示例演示               ║
@@ -28,41 +44,250 @@ def demo_scenario():
     ║  场景：音乐人Alice将歌曲授权给唱片公司Bob                  ║
     ║                                                          ║
     ╚══════════════════════════════════════════════════════════╝
-    """)
+    """
+
+_SUMMARY = """
+    1. 📝 不可篡改的版权记录
+       - 作品哈希永久记录在区块链上
+       - 授权历史完整可追溯
+    
+    2. ⏰ 时间锁强制执行
+       - 授权生效和到期由协议层面保证
+       - 无需第三方监督，自动执行
+    
+    3. 🔒 多重签名保护
+       - 续期需要双方确认
+       - 防止单方面违约
+    
+    4. 🌳 清晰的授权层级
+       - UTXO模型追踪每个授权状态
+       - 次级授权形成树状结构
+    
+    5. 💰 灵活的价值流转
+       - CPC承载版权状态
+       - 授权费直接在链上结算
+    
+    6. 🔍 透明可验证
+       - 任何人都可以验证版权证明的真实性
+       - 通过作品哈希查询授权链条
+    """
+
+# 阶段二至五的演示文本模板：每个阶段只引用少数几个时间/哈希变量，
+# 用 format_map 一次填充后整段写出，代替逐行的 f-string
+_STAGE2_TEMPLATE = """\
+Alice和唱片公司Bob达成协议：
+  - 授权Bob发行和复制该歌曲
+  - 授权7天后生效（合同审核期）
+  - 授权期限1年
+  - 授权范围：复制权、发行权
+
+当前时间: {now}
+生效时间: {start}
+到期时间: {end}
+
+Alice创建授权锁定交易：
+   > 选择 7. 授权锁定
+   > 作品哈希: {work_hash}
+   > 被授权人地址: Bob的地址
+   > 几天后生效: 7
+   > 授权期限（天）: 365
+   > 授权权利范围: 复制权,发行权
+
+交易详情：
+   类型: authorization_lock
+   输入:
+     - [0] Alice的版权主权UTXO (1.0 CPC)
+     - [1] Alice的燃料UTXO (3.99 CPC)
+   输出:
+     - [0] 授权指令UTXO (0.01 CPC) → Bob
+          ├─ 锁定脚本: TIMELOCK + REDEMPTION
+          │  ├─ 时间锁: {start_ts}
+          │  ├─ 解锁地址: Bob
+          │  └─ 赎回条件: {end_ts}后Alice可赎回
+          └─ Payload:
+             ├─ work_hash: {whash32}...
+             ├─ copyright_type: instruction
+             ├─ rights_scope: [复制权, 发行权]
+             ├─ start_time: {start_ts}
+             └─ end_time: {end_ts}
+     - [1] 重新铸造的版权主权UTXO (1.0 CPC) → Alice
+     - [2] 找零UTXO (2.97 CPC) → Alice
+
+关键点：
+  ⚠️  Bob此时无法花费授权指令UTXO（时间锁未到期）
+  ⚠️  Bob无法向外界证明自己拥有版权
+  ✓  Alice保留了版权主权UTXO
+
+"""
+
+_TIME_PASSES_TEMPLATE = """\
+当前时间: {start} （模拟）
+✓ 授权时间锁到期！
+
+"""
+
+_STAGE3_TEMPLATE = """\
+Bob现在可以激活授权，获得版权证明：
+   > 选择 8. 激活授权
+   > 授权指令UTXO的交易ID: <上一步的txid>
+   > 输出索引: 0
+
+交易详情：
+   类型: authorization_activate
+   输入:
+     - [0] 授权指令UTXO (0.01 CPC)
+   输出:
+     - [0] 版权证明UTXO (0.01 CPC) → Bob
+          ├─ 锁定脚本: P2PKH + REDEMPTION
+          │  ├─ 解锁地址: Bob
+          │  └─ 赎回条件: {end_ts}后Alice可赎回
+          └─ Payload:
+             ├─ work_hash: {whash32}... (继承)
+             ├─ copyright_type: proof
+             ├─ rights_scope: [复制权, 发行权]
+             ├─ start_time: {start_ts}
+             └─ end_time: {end_ts}
+
+矿工验证：
+  ✓ 时间锁已到期
+  ✓ Bob的签名有效
+  ✓ 作品哈希正确继承
+
+结果：
+  ✓ Bob获得了可花费、可证明的版权凭证
+  ✓ 授权正式生效
+  ✓ Bob可以向流媒体平台等证明自己有权发行该歌曲
+
+"""
+
+_STAGE4_TEMPLATE = """\
+情况1：续期（在到期前）
+{rule}
+如果Alice和Bob希望继续合作：
+
+续期交易：
+   类型: renewal
+   输入:
+     - [0] Bob的旧证明UTXO (0.01 CPC)
+     - [1] Alice的燃料UTXO
+     - [2] Bob的燃料UTXO
+   签名要求: Alice和Bob共同签名（多重签名）
+   输出:
+     - [0] 新的证明UTXO (0.01 CPC) → Bob
+          └─ end_time: {renew_ts} (延长1年)
+
+  ✓ 续期费用由双方共同承担
+  ✓ 单方面无法强制续期
+
+
+情况2：自动失效（到期后未续签）
+{rule}
+时间到达: {end}
+
+赎回交易：
+   类型: redemption
+   输入:
+     - [0] Bob的过期证明UTXO (0.01 CPC)
+   签名要求: Alice单方签名即可
+   输出:
+     - [0] 燃料UTXO (0.01 CPC) → Alice
+
+  ✓ 授权自动终止
+  ✓ Bob的证明UTXO失效
+  ✓ Alice收回授权
+
+"""
+
+_STAGE5_TEMPLATE = """\
+场景：Bob希望授权给流媒体平台Carol，但仅授予复制权
+
+次级授权交易：
+   类型: sub_license
+   输入:
+     - [0] Bob的证明UTXO (0.01 CPC)
+     - [1] Carol的燃料UTXO (5.0 CPC) ← Carol承担费用
+     - [2] Carol的授权费UTXO (10.0 CPC)
+   输出:
+     - [0] Bob的新证明UTXO (0.01 CPC)
+          └─ Payload更新，记录已授权给Carol
+     - [1] Carol的次级证明UTXO (0.01 CPC)
+          └─ Payload:
+             ├─ copyright_type: secondary
+             ├─ rights_scope: [复制权] ← 仅复制权
+             ├─ parent_utxo: Bob的证明UTXO标识
+             └─ end_time: {end_ts} (继承)
+     - [2] 授权费收入 (10.0 CPC) → Bob
+     - [3] 找零 → Carol
+
+矿工验证：
+  ✓ Carol的权利范围 [复制权] ⊆ Bob的权利范围 [复制权, 发行权]
+  ✓ Carol的授权不能超过Bob的到期时间
+  ✓ Bob的证明UTXO被正确更新
+
+结果：
+  ✓ Bob获得授权费收入，并保留自己的完整权利
+  ✓ Carol获得受限的次级版权证明
+  ✓ 形成清晰的授权链条：Alice → Bob → Carol
+
+"""
+
+# 章节标题文本按标题缓存，每个标题只拼接一次
+_BANNER_CACHE = {}
+
+
+def print_section(title):
+    """打印章节标题"""
+    banner = _BANNER_CACHE.get(title)
+    if banner is None:
+        banner = _BANNER_CACHE[title] = f"\n{'=' * 60}\n  {title}\n{'=' * 60}\n\n"
+    _output.write(banner)
+
+
+def demo_scenario(interactive: bool = True):
+    """
+    演示完整的版权授权场景
+    
+    Args:
+        interactive: 是否在每个章节结束时等待回车
+    """
+    # 非交互模式（--noninteractive，用于CI、性能分析）只写出输出，不等待回车
+    pause = wait_for_enter if interactive else (lambda prompt="": flush_output())
+    
+    emit(_INTRO_BANNER)
     
     # ========== 阶段0：准备工作 ==========
     print_section("阶段0：准备工作")
     
-    print("1. 启动矿工节点")
-    print("   $ python cpc_miner.py")
-    print("   ✓ 矿工节点运行在 http://localhost:5001\n")
+    emit("1. 启动矿工节点")
+    emit("   $ python cpc_miner.py")
+    emit("   ✓ 矿工节点运行在 http://localhost:5001\n")
     
-    print("2. Alice生成钱包")
-    print("   $ python cpc_wallet.py")
-    print("   > 选择 1. 生成新钱包")
-    print("   > 文件名: alice_wallet")
-    print("   ✓ 钱包地址: alice_public_key_base64...")
-    print()
+    emit("2. Alice生成钱包")
+    emit("   $ python cpc_wallet.py")
+    emit("   > 选择 1. 生成新钱包")
+    emit("   > 文件名: alice_wallet")
+    emit("   ✓ 钱包地址: alice_public_key_base64...")
+    emit()
     
-    print("3. Bob生成钱包")
-    print("   > 选择 1. 生成新钱包")
-    print("   > 文件名: bob_wallet")
-    print("   ✓ 钱包地址: bob_public_key_base64...")
-    print()
+    emit("3. Bob生成钱包")
+    emit("   > 选择 1. 生成新钱包")
+    emit("   > 文件名: bob_wallet")
+    emit("   ✓ 钱包地址: bob_public_key_base64...")
+    emit()
     
-    print("4. Alice和Bob从水龙头领取CPC")
-    print("   > 选择 4. 从水龙头领取CPC")
-    print("   ✓ Alice领取 5 CPC")
-    print("   ✓ Bob领取 5 CPC")
-    print()
+    emit("4. Alice和Bob从水龙头领取CPC")
+    emit("   > 选择 4. 从水龙头领取CPC")
+    emit("   ✓ Alice领取 5 CPC")
+    emit("   ✓ Bob领取 5 CPC")
+    emit()
     
-    input("按回车继续...")
+    pause()
     
     # ========== 阶段一：版权注册 ==========
     print_section("阶段一：版权注册（资产的首次铸造）")
     
-    print("Alice创作了一首原创歌曲《星空之下》")
-    print()
+    emit("Alice创作了一首原创歌曲《星空之下》")
+    emit()
     
     # 创建示例文件
     song_content = """
@@ -75,261 +300,113 @@ def demo_scenario():
     爱意永不褪色
     """
     
+    # 只编码一次：写入文件和计算哈希使用同一份字节
+    song_bytes = song_content.encode("utf-8")
+    
     song_file = "star_song.txt"
-    with open(song_file, "w", encoding="utf-8") as f:
-        f.write(song_content)
-    
-    # 计算哈希
-    work_hash = hashlib.sha256(song_content.encode()).hexdigest()
-    print(f"作品内容: {song_content[:50]}...")
-    print(f"作品哈希: {work_hash}\n")
-    
-    print("Alice通过钱包注册版权：")
-    print("   > 选择 6. 注册版权")
-    print(f"   > 作品文件路径: {song_file}")
-    print("   > 作品标题: 星空之下")
-    print()
-    
-    print("交易详情：")
-    print("   类型: copyright_register")
-    print("   输入: ")
-    print("     - [0] Alice的燃料UTXO (5.0 CPC)")
-    print("   输出:")
-    print("     - [0] 版权主权UTXO (1.0 CPC) → Alice")
-    print("          └─ Payload:")
-    print(f"             ├─ work_hash: {work_hash[:32]}...")
-    print("             ├─ work_title: 星空之下")
-    print("             ├─ author: Alice")
-    print("             ├─ copyright_type: sovereignty")
-    print("             └─ rights_scope: [复制权, 发行权, 改编权, 表演权, ...]")
-    print("     - [1] 找零UTXO (3.99 CPC) → Alice")
-    print()
-    
-    print("✓ 矿工验证并打包交易")
-    print("✓ Alice获得版权主权UTXO，拥有作品的最高级身份凭证")
-    print()
-    
-    input("按回车继续...")
+    # 几百字节的常量内容，直接写底层文件描述符，不经过文件对象的缓冲层
+    fd = os.open(song_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, song_bytes)
+    finally:
+        os.close(fd)
+    
+    # 计算哈希（与钱包对文件内容计算的哈希一致）
+    work_hash = hashlib.sha256(song_bytes).hexdigest()
+    work_hash_short = work_hash[:32]
+    emit(f"作品内容: {song_content[:50]}...")
+    emit(f"作品哈希: {work_hash}\n")
+    
+    emit("Alice通过钱包注册版权：")
+    emit("   > 选择 6. 注册版权")
+    emit(f"   > 作品文件路径: {song_file}")
+    emit("   > 作品标题: 星空之下")
+    emit()
+    
+    emit("交易详情：")
+    emit("   类型: copyright_register")
+    emit("   输入: ")
+    emit("     - [0] Alice的燃料UTXO (5.0 CPC)")
+    emit("   输出:")
+    emit("     - [0] 版权主权UTXO (1.0 CPC) → Alice")
+    emit("          └─ Payload:")
+    emit(f"             ├─ work_hash: {work_hash_short}...")
+    emit("             ├─ work_title: 星空之下")
+    emit("             ├─ author: Alice")
+    emit("             ├─ copyright_type: sovereignty")
+    emit("             └─ rights_scope: [复制权, 发行权, 改编权, 表演权, ...]")
+    emit("     - [1] 找零UTXO (3.99 CPC) → Alice")
+    emit()
+    
+    emit("✓ 矿工验证并打包交易")
+    emit("✓ Alice获得版权主权UTXO，拥有作品的最高级身份凭证")
+    emit()
+    
+    pause()
     
     # ========== 阶段二：授权锁定 ==========
     print_section("阶段二：授权锁定（延迟生效的承诺）")
     
-    print("Alice和唱片公司Bob达成协议：")
-    print("  - 授权Bob发行和复制该歌曲")
-    print("  - 授权7天后生效（合同审核期）")
-    print("  - 授权期限1年")
-    print("  - 授权范围：复制权、发行权")
-    print()
-    
     current_time = int(time.time())
     start_time = current_time + 7 * 86400  # 7天后
     end_time = start_time + 365 * 86400    # 1年期限
-    
-    print(f"当前时间: {time.ctime(current_time)}")
-    print(f"生效时间: {time.ctime(start_time)}")
-    print(f"到期时间: {time.ctime(end_time)}")
-    print()
-    
-    print("Alice创建授权锁定交易：")
-    print("   > 选择 7. 授权锁定")
-    print(f"   > 作品哈希: {work_hash}")
-    print("   > 被授权人地址: Bob的地址")
-    print("   > 几天后生效: 7")
-    print("   > 授权期限（天）: 365")
-    print("   > 授权权利范围: 复制权,发行权")
-    print()
-    
-    print("交易详情：")
-    print("   类型: authorization_lock")
-    print("   输入:")
-    print("     - [0] Alice的版权主权UTXO (1.0 CPC)")
-    print("     - [1] Alice的燃料UTXO (3.99 CPC)")
-    print("   输出:")
-    print("     - [0] 授权指令UTXO (0.01 CPC) → Bob")
-    print("          ├─ 锁定脚本: TIMELOCK + REDEMPTION")
-    print(f"          │  ├─ 时间锁: {start_time}")
-    print("          │  ├─ 解锁地址: Bob")
-    print(f"          │  └─ 赎回条件: {end_time}后Alice可赎回")
-    print("          └─ Payload:")
-    print(f"             ├─ work_hash: {work_hash[:32]}...")
-    print("             ├─ copyright_type: instruction")
-    print("             ├─ rights_scope: [复制权, 发行权]")
-    print(f"             ├─ start_time: {start_time}")
-    print(f"             └─ end_time: {end_time}")
-    print("     - [1] 重新铸造的版权主权UTXO (1.0 CPC) → Alice")
-    print("     - [2] 找零UTXO (2.97 CPC) → Alice")
-    print()
-    
-    print("关键点：")
-    print("  ⚠️  Bob此时无法花费授权指令UTXO（时间锁未到期）")
-    print("  ⚠️  Bob无法向外界证明自己拥有版权")
-    print("  ✓  Alice保留了版权主权UTXO")
-    print()
-    
-    input("按回车继续...")
+    now_str, start_str, end_str = map(time.ctime, (current_time, start_time, end_time))
+    
+    # 阶段二至五共用的模板变量
+    fields = {
+        "now": now_str,
+        "start": start_str,
+        "end": end_str,
+        "work_hash": work_hash,
+        "whash32": work_hash_short,
+        "start_ts": start_time,
+        "end_ts": end_time,
+        "renew_ts": end_time + 365 * 86400,
+        "rule": "-" * 60,
+    }
+    _output.write(_STAGE2_TEMPLATE.format_map(fields))
+    
+    pause()
     
     # ========== 模拟时间流逝 ==========
     print_section("⏰ 7天过去了...")
     
-    print(f"当前时间: {time.ctime(start_time)} （模拟）")
-    print("✓ 授权时间锁到期！")
-    print()
+    _output.write(_TIME_PASSES_TEMPLATE.format_map(fields))
     
-    input("按回车继续...")
+    pause()
     
     # ========== 阶段三：授权激活 ==========
     print_section("阶段三：授权激活（版权证明的生成）")
     
-    print("Bob现在可以激活授权，获得版权证明：")
-    print("   > 选择 8. 激活授权")
-    print("   > 授权指令UTXO的交易ID: <上一步的txid>")
-    print("   > 输出索引: 0")
-    print()
-    
-    print("交易详情：")
-    print("   类型: authorization_activate")
-    print("   输入:")
-    print("     - [0] 授权指令UTXO (0.01 CPC)")
-    print("   输出:")
-    print("     - [0] 版权证明UTXO (0.01 CPC) → Bob")
-    print("          ├─ 锁定脚本: P2PKH + REDEMPTION")
-    print("          │  ├─ 解锁地址: Bob")
-    print(f"          │  └─ 赎回条件: {end_time}后Alice可赎回")
-    print("          └─ Payload:")
-    print(f"             ├─ work_hash: {work_hash[:32]}... (继承)")
-    print("             ├─ copyright_type: proof")
-    print("             ├─ rights_scope: [复制权, 发行权]")
-    print(f"             ├─ start_time: {start_time}")
-    print(f"             └─ end_time: {end_time}")
-    print()
-    
-    print("矿工验证：")
-    print("  ✓ 时间锁已到期")
-    print("  ✓ Bob的签名有效")
-    print("  ✓ 作品哈希正确继承")
-    print()
-    
-    print("结果：")
-    print("  ✓ Bob获得了可花费、可证明的版权凭证")
-    print("  ✓ 授权正式生效")
-    print("  ✓ Bob可以向流媒体平台等证明自己有权发行该歌曲")
-    print()
-    
-    input("按回车继续...")
+    _output.write(_STAGE3_TEMPLATE.format_map(fields))
+    
+    pause()
     
     # ========== 阶段四：授权维持 ==========
     print_section("阶段四：授权维持与失效")
     
-    print("情况1：续期（在到期前）")
-    print("-" * 60)
-    print("如果Alice和Bob希望继续合作：")
-    print()
-    print("续期交易：")
-    print("   类型: renewal")
-    print("   输入:")
-    print("     - [0] Bob的旧证明UTXO (0.01 CPC)")
-    print("     - [1] Alice的燃料UTXO")
-    print("     - [2] Bob的燃料UTXO")
-    print("   签名要求: Alice和Bob共同签名（多重签名）")
-    print("   输出:")
-    print("     - [0] 新的证明UTXO (0.01 CPC) → Bob")
-    print(f"          └─ end_time: {end_time + 365*86400} (延长1年)")
-    print()
-    print("  ✓ 续期费用由双方共同承担")
-    print("  ✓ 单方面无法强制续期")
-    print()
-    
-    print("\n情况2：自动失效（到期后未续签）")
-    print("-" * 60)
-    print(f"时间到达: {time.ctime(end_time)}")
-    print()
-    print("赎回交易：")
-    print("   类型: redemption")
-    print("   输入:")
-    print("     - [0] Bob的过期证明UTXO (0.01 CPC)")
-    print("   签名要求: Alice单方签名即可")
-    print("   输出:")
-    print("     - [0] 燃料UTXO (0.01 CPC) → Alice")
-    print()
-    print("  ✓ 授权自动终止")
-    print("  ✓ Bob的证明UTXO失效")
-    print("  ✓ Alice收回授权")
-    print()
-    
-    input("按回车继续...")
+    _output.write(_STAGE4_TEMPLATE.format_map(fields))
+    
+    pause()
     
     # ========== 阶段五：次级授权 ==========
     print_section("阶段五：次级授权与转让")
     
-    print("场景：Bob希望授权给流媒体平台Carol，但仅授予复制权")
-    print()
-    
-    print("次级授权交易：")
-    print("   类型: sub_license")
-    print("   输入:")
-    print("     - [0] Bob的证明UTXO (0.01 CPC)")
-    print("     - [1] Carol的燃料UTXO (5.0 CPC) ← Carol承担费用")
-    print("     - [2] Carol的授权费UTXO (10.0 CPC)")
-    print("   输出:")
-    print("     - [0] Bob的新证明UTXO (0.01 CPC)")
-    print("          └─ Payload更新，记录已授权给Carol")
-    print("     - [1] Carol的次级证明UTXO (0.01 CPC)")
-    print("          └─ Payload:")
-    print("             ├─ copyright_type: secondary")
-    print("             ├─ rights_scope: [复制权] ← 仅复制权")
-    print("             ├─ parent_utxo: Bob的证明UTXO标识")
-    print(f"             └─ end_time: {end_time} (继承)")
-    print("     - [2] 授权费收入 (10.0 CPC) → Bob")
-    print("     - [3] 找零 → Carol")
-    print()
-    
-    print("矿工验证：")
-    print("  ✓ Carol的权利范围 [复制权] ⊆ Bob的权利范围 [复制权, 发行权]")
-    print("  ✓ Carol的授权不能超过Bob的到期时间")
-    print("  ✓ Bob的证明UTXO被正确更新")
-    print()
-    
-    print("结果：")
-    print("  ✓ Bob获得授权费收入，并保留自己的完整权利")
-    print("  ✓ Carol获得受限的次级版权证明")
-    print("  ✓ 形成清晰的授权链条：Alice → Bob → Carol")
-    print()
-    
-    input("按回车继续...")
+    _output.write(_STAGE5_TEMPLATE.format_map(fields))
+    
+    pause()
     
     # ========== 总结 ==========
     print_section("总结：时权链的核心优势")
     
-    print("""
-    1. 📝 不可篡改的版权记录
-       - 作品哈希永久记录在区块链上
-       - 授权历史完整可追溯
-    
-    2. ⏰ 时间锁强制执行
-       - 授权生效和到期由协议层面保证
-       - 无需第三方监督，自动执行
-    
-    3. 🔒 多重签名保护
-       - 续期需要双方确认
-       - 防止单方面违约
-    
-    4. 🌳 清晰的授权层级
-       - UTXO模型追踪每个授权状态
-       - 次级授权形成树状结构
+    emit(_SUMMARY)
     
-    5. 💰 灵活的价值流转
-       - CPC承载版权状态
-       - 授权费直接在链上结算
-    
-    6. 🔍 透明可验证
-       - 任何人都可以验证版权证明的真实性
-       - 通过作品哈希查询授权链条
-    """)
+    emit("\n" + "="*60)
+    emit("  感谢体验时权链 (Time-Rights Chain)！")
+    emit("  用区块链技术守护创作价值")
+    emit("="*60 + "\n")
     
-    print("\n" + "="*60)
-    print("  感谢体验时权链 (Time-Rights Chain)！")
-    print("  用区块链技术守护创作价值")
-    print("="*60 + "\n")
+    flush_output()
     
     # 清理示例文件
     if os.path.exists(song_file):
@@ -338,8 +415,9 @@ def demo_scenario():
 
 if __name__ == '__main__':
     try:
-        demo_scenario()
+        demo_scenario(interactive="--noninteractive" not in sys.argv)
     except KeyboardInterrupt:
+        flush_output()
         print("\n\n演示已中断")
 
 
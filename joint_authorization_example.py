@@ -3,8 +3,30 @@
 演示作者和公司如何共同创建授权锁定交易，公司承担所有燃料费用
 """
 
-from transaction import Transaction, TransactionInput, TransactionOutput
-from utxo import CopyrightPayload, TimeLockScript
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterable
+
+# transaction/utxo（以及它们依赖的ecdsa等）在第一次构建交易时才导入，
+# 只引用本模块的代码不必承担这部分导入开销
+if TYPE_CHECKING:
+    from transaction import Transaction
+
+
+# P2PKH脚本只有地址部分不同：第一次使用时生成模板，之后构建交易只做字符串替换
+_ADDRESS_PLACEHOLDER = "{address}"
+_P2PKH_TEMPLATE = None
+
+
+def _p2pkh_script(address: str) -> str:
+    """支付到指定地址的P2PKH锁定脚本字符串"""
+    global _P2PKH_TEMPLATE
+    if _P2PKH_TEMPLATE is None:
+        from utxo import TimeLockScript
+        _P2PKH_TEMPLATE = TimeLockScript(
+            script_type=TimeLockScript.SCRIPT_TYPE_P2PKH,
+            addresses=[_ADDRESS_PLACEHOLDER]
+        ).to_string()
+    return _P2PKH_TEMPLATE.replace(_ADDRESS_PLACEHOLDER, address)
 
 
 def create_joint_authorization_lock_tx(
@@ -15,8 +37,8 @@ def create_joint_authorization_lock_tx(
     company_public_key: str,
     work_hash: str,
     work_title: str,
-    rights_scope: list
-) -> Transaction:
+    rights_scope: Iterable[str]
+) -> "Transaction":
     """
     创建联合授权锁定交易（公司承担燃料费用）
     
@@ -37,11 +59,13 @@ def create_joint_authorization_lock_tx(
         company_public_key: 公司的公钥
         work_hash: 作品哈希
         work_title: 作品标题
-        rights_scope: 授权范围，如 ["复制权", "发行权"]
+        rights_scope: 授权范围（任意可迭代对象），如 ["复制权", "发行权"]
     
     Returns:
         未签名的交易对象（需要双方分别签名）
     """
+    from transaction import Transaction, TransactionInput, TransactionOutput
+    from utxo import CopyrightPayload, COIN, to_sats
     
     # 构建输入
     inputs = [
@@ -64,48 +88,42 @@ def create_joint_authorization_lock_tx(
     # 构建输出
     outputs = []
     
-    # 输出1: 授权指令UTXO → 公司
-    instruction_payload = CopyrightPayload(
+    # 两个版权输出的payload只有类型和权利范围不同，共用一份基础字典
+    base_payload = CopyrightPayload(
         work_hash=work_hash,
         work_title=work_title,
         author=author_sovereignty_utxo["address"],
         copyright_type="instruction",
         rights_scope=rights_scope
-    )
+    ).to_dict()
     
-    instruction_script = TimeLockScript(
-        script_type=TimeLockScript.SCRIPT_TYPE_P2PKH,
-        addresses=[company_address]
-    ).to_string()
+    # 输出1: 授权指令UTXO → 公司
+    instruction_payload = base_payload
+    instruction_script = _p2pkh_script(company_address)
     
+    instruction_amount = 0.01  # 给公司的 instruction UTXO
     outputs.append(TransactionOutput(
-        amount=0.01,  # 给公司的 instruction UTXO
+        amount=instruction_amount,
         address=company_address,
         script_pubkey=instruction_script,
         utxo_type="copyright",
-        payload=instruction_payload.to_dict()
+        payload=instruction_payload
     ))
     
     # 输出2: 重新铸造的 sovereignty UTXO → 作者（原路返回）
-    sovereignty_payload = CopyrightPayload(
-        work_hash=work_hash,
-        work_title=work_title,
-        author=author_sovereignty_utxo["address"],
-        copyright_type="sovereignty",
-        rights_scope=author_sovereignty_utxo["payload"]["rights_scope"]
-    )
-    
-    sovereignty_script = TimeLockScript(
-        script_type=TimeLockScript.SCRIPT_TYPE_P2PKH,
-        addresses=[author_sovereignty_utxo["address"]]
-    ).to_string()
+    sovereignty_payload = {
+        **base_payload,
+        "copyright_type": "sovereignty",
+        "rights_scope": author_sovereignty_utxo["payload"]["rights_scope"]
+    }
+    sovereignty_script = _p2pkh_script(author_sovereignty_utxo["address"])
     
     outputs.append(TransactionOutput(
         amount=author_sovereignty_utxo["amount"],  # 原路返回给作者
         address=author_sovereignty_utxo["address"],
         script_pubkey=sovereignty_script,
         utxo_type="copyright",
-        payload=sovereignty_payload.to_dict()
+        payload=sovereignty_payload
     ))
     
     # 创建交易
@@ -121,10 +139,16 @@ def create_joint_authorization_lock_tx(
         }
     )
     
-    # 计算手续费
-    input_total = author_sovereignty_utxo["amount"] + company_fuel_utxo["amount"]
-    output_total = sum(out.amount for out in outputs)
-    fee = input_total - output_total
+    # 计算手续费（整数聪运算，避免浮点误差如 0.009999999999999787）
+    spent_sats = {
+        (utxo["txid"], utxo["vout"]): to_sats(utxo["amount"])
+        for utxo in (author_sovereignty_utxo, company_fuel_utxo)
+    }
+    fee_sats = tx.compute_fee(lambda txid, vout: spent_sats[(txid, vout)])
+    output_sats = tx.output_sats()
+    input_total = (output_sats + fee_sats) / COIN
+    output_total = output_sats / COIN
+    fee = fee_sats / COIN
     
     print(f"\n📝 交易详情:")
     print(f"   输入总额: {input_total} CPC")
@@ -139,7 +163,7 @@ def create_joint_authorization_lock_tx(
     return tx
 
 
-def sign_and_submit_joint_transaction(tx: Transaction, author_wallet, company_wallet):
+def sign_and_submit_joint_transaction(tx: "Transaction", author_wallet, company_wallet):
     """
     签名并提交联合交易
     
@@ -151,15 +175,20 @@ def sign_and_submit_joint_transaction(tx: Transaction, author_wallet, company_wa
     
     print(f"\n🔐 签名流程:")
     
-    # 作者签名自己的输入
-    print(f"   1. 作者签名 inputs[0]...")
-    tx.inputs[0].signature = author_wallet.sign(tx.txid)
-    print(f"      ✓ 作者签名完成")
-    
-    # 公司签名自己的输入
-    print(f"   2. 公司签名 inputs[1]...")
-    tx.inputs[1].signature = company_wallet.sign(tx.txid)
-    print(f"      ✓ 公司签名完成")
+    # 两个签名都只依赖txid、互不依赖，并行计算（签名库在C扩展中运行时不占用GIL）
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        author_sig = ex.submit(author_wallet.sign, tx.txid)
+        company_sig = ex.submit(company_wallet.sign, tx.txid)
+        
+        # 作者签名自己的输入
+        print(f"   1. 作者签名 inputs[0]...")
+        tx.inputs[0].signature = author_sig.result()
+        print(f"      ✓ 作者签名完成")
+        
+        # 公司签名自己的输入
+        print(f"   2. 公司签名 inputs[1]...")
+        tx.inputs[1].signature = company_sig.result()
+        print(f"      ✓ 公司签名完成")
     
     # 提交交易
     print(f"   3. 提交交易到网络...")
@@ -7,10 +7,13 @@
 import sys
 import os
 import time
-import json
-import threading
+import hashlib
+import tempfile
+import orjson
 import requests
-from cpc_wallet import CPCWallet
+from concurrent.futures import ThreadPoolExecutor
+import cpc_wallet
+from cpc_wallet import CPCWallet, generate_keypair, request_faucet
 
 def print_section(title):
     """打印分隔符"""
@@ -18,6 +21,51 @@ def print_section(title):
     print(f"  {title}")
     print(f"{'='*60}\n")
 
+def wait_for_node(timeout: float = 10.0) -> bool:
+    """轮询节点 /status 直到可以响应，代替固定的 sleep"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f"{cpc_wallet.NODE_URL}/status", timeout=0.1)
+            return True
+        except requests.RequestException:
+            time.sleep(0.1)
+    return False
+
+
+def get_height() -> int:
+    """查询当前区块高度"""
+    return requests.get(f"{cpc_wallet.NODE_URL}/status").json()["blockchain_height"]
+
+
+def wait_for_block(height: int, *wallets, timeout: float = 60.0) -> bool:
+    """
+    等待区块高度超过 height（即提交的交易已被打包），代替固定的 sleep
+    
+    出块后清除各钱包的UTXO缓存
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if get_height() > height:
+            for wallet in wallets:
+                wallet.invalidate_utxos()
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def wait_for_funds(*wallets, timeout: float = 60.0) -> bool:
+    """等待各钱包都查询到余额（水龙头交易可能被打包进不同的区块）"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        for wallet in wallets:
+            wallet.invalidate_utxos()
+        if all(wallet.get_balance() > 0 for wallet in wallets):
+            return True
+        time.sleep(0.1)
+    return False
+
+
 def test_multisig_authorization():
     """测试多签授权工作流"""
     
@@ -27,130 +75,126 @@ def test_multisig_authorization():
     # ========== 第1步: 启动矿工 ==========
     print("1️⃣  启动矿工节点...")
     import subprocess
-    # 在后台启动矿工进程
-    miner_process = subprocess.Popen(
-        [sys.executable, "cpc_miner.py"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        cwd=os.path.dirname(os.path.abspath(__file__))
-    )
-    time.sleep(3)
-    print("✅ 矿工已启动\n")
+    # 矿工在临时目录中运行：链日志和审计文件都写在这里，不碰仓库中的 chain.log
+    with tempfile.TemporaryDirectory() as workdir:
+        # 在后台启动矿工进程
+        miner_process = subprocess.Popen(
+            [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "cpc_miner.py")],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=workdir
+        )
+        try:
+            if not wait_for_node():
+                print("❌ 矿工节点未能启动")
+                return False
+            print("✅ 矿工已启动\n")
+            return _run_multisig_workflow(workdir)
+        finally:
+            # 关闭矿工进程
+            miner_process.terminate()
+            miner_process.wait(timeout=5)
+
+
+def _run_multisig_workflow(workdir: str):
+    """
+    矿工启动后执行的多签工作流步骤
+    
+    Args:
+        workdir: 本次测试的临时目录（审计文件写在这里，测试结束后删除）
+    """
     
-    # ========== 第2步: 创建作者钱包 ==========
-    print("2️⃣  作者创建钱包并领取水龙头...")
-    author = CPCWallet()
+    # ========== 第2步: 创建作者和被授权人钱包 ==========
+    print("2️⃣  作者和被授权人创建钱包并领取水龙头...")
+    author = CPCWallet(*generate_keypair())
     author_address = author.address
     print(f"  作者地址: {author_address}")
     
-    # 领取水龙头
-    faucet_txid = author.claim_faucet(10)
-    if not faucet_txid:
-        print("❌ 水龙头领取失败")
-        return False
-    print(f"  ✓ 领取10 CPC，交易ID: {faucet_txid[:16]}...\n")
-    time.sleep(2)
-    
-    # ========== 第3步: 创建被授权人钱包 ==========
-    print("3️⃣  被授权人创建钱包并领取水龙头...")
-    licensee = CPCWallet()
+    # ========== 第3步: 被授权人创建钱包 ==========
+    licensee = CPCWallet(*generate_keypair())
     licensee_address = licensee.address
     print(f"  被授权人地址: {licensee_address}")
     
-    # 领取水龙头
-    faucet_txid = licensee.claim_faucet(10)
-    if not faucet_txid:
+    # 两次水龙头领取互不依赖：并发提交，矿工可以把它们打包进同一个区块
+    # （每个钱包使用自己的HTTP会话，requests.Session 不能在线程间共用）
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        faucet_txids = list(ex.map(request_faucet, [author, licensee]))
+    if not all(faucet_txids):
         print("❌ 水龙头领取失败")
         return False
-    print(f"  ✓ 领取10 CPC，交易ID: {faucet_txid[:16]}...\n")
-    time.sleep(2)
+    for txid in faucet_txids:
+        print(f"  ✓ 领取5 CPC，交易ID: {txid[:16]}...")
+    print()
+    if not wait_for_funds(author, licensee):
+        print("❌ 水龙头交易未被打包")
+        return False
     
     # ========== 第4步: 作者注册版权 ==========
     print("4️⃣  作者注册版权...")
-    work_hash = "hash_example_work_001"
+    work_content = f"我的创意作品 {time.time()}".encode()  # 每次运行都是一个新作品
+    work_hash = hashlib.sha256(work_content).hexdigest()
     work_title = "我的创意作品"
-    rights_scope = ["print", "distribute"]
+    rights_scope = ["复制权", "发行权"]
     
-    register_txid = author.register_copyright(work_hash, work_title, rights_scope)
+    with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as f:
+        f.write(work_content)
+        work_file = f.name
+    
+    height = get_height()
+    try:
+        register_txid = author.register_copyright(work_file, work_title)
+    finally:
+        os.remove(work_file)
     if not register_txid:
         print("❌ 版权注册失败")
         return False
     print(f"  ✓ 版权注册成功，交易ID: {register_txid[:16]}...\n")
-    time.sleep(2)
+    wait_for_block(height, author)
     
     # ========== 第5步: 作者创建多签授权交易 ==========
     print("5️⃣  作者创建多签授权交易（第一步）...")
     print(f"  授权给: {licensee_address}")
     print(f"  作品: {work_title}")
     
-    # 创建多签交易（返回临时文件名）
-    temp_file = author.lock_authorization(
+    # 创建多签交易（返回内存中的交易对象，后续步骤直接传递，不读写临时文件）
+    pending_tx = author.lock_authorization(
         work_hash=work_hash,
         licensee_address=licensee_address,
         rights_scope=rights_scope,
-        create_multisig=True
+        create_multisig=True,
+        save_file=False
     )
     
-    if not temp_file:
+    if not pending_tx:
         print("❌ 多签授权交易创建失败")
         return False
     
-    print(f"\n✅ 已创建临时交易文件: {temp_file}")
+    print(f"\n✅ 已创建多签交易")
     
     # 显示交易状态
-    try:
-        with open(temp_file, 'r', encoding='utf-8') as f:
-            tx_dict = json.load(f)
-        print(f"\n📋 交易状态:")
-        print(f"  交易ID: {tx_dict['txid'][:16]}...")
-        print(f"  输入数: {len(tx_dict['inputs'])}")
-        for i, inp in enumerate(tx_dict['inputs']):
-            required = inp['required_signers']
-            signed = list(inp['signatures'].keys())
-            status = "已签名" if required == signed else "未签名"
-            print(f"    输入{i+1}: 需要{required} | {status}")
-    except Exception as e:
-        print(f"⚠️  无法读取交易详情: {e}")
-    
-    # ========== 第6步: 被授权人添加燃料UTXO ==========
-    print(f"\n6️⃣  被授权人接收交易并添加燃料UTXO...")
-    result = licensee.prepare_multisig_authorization(temp_file)
+    CPCWallet.describe_multisig(pending_tx)
     
-    if not result:
-        print("❌ 添加燃料UTXO失败")
-        return False
+    # ========== 第6/7步: 被授权人添加燃料UTXO并签名 ==========
+    print(f"\n6️⃣  被授权人接收交易、添加燃料UTXO并签名...")
     
-    print(f"\n✅ 燃料UTXO已添加")
-    
-    # 显示更新后的交易状态
-    try:
-        with open(temp_file, 'r', encoding='utf-8') as f:
-            tx_dict = json.load(f)
-        print(f"\n📋 更新后的交易状态:")
-        print(f"  交易ID: {tx_dict['txid'][:16]}...")
-        print(f"  输入数: {len(tx_dict['inputs'])}")
-        for i, inp in enumerate(tx_dict['inputs']):
-            required = inp['required_signers']
-            signed = list(inp['signatures'].keys())
-            status = "已签名" if required == signed else "未签名"
-            print(f"    输入{i+1}: 需要{required} | {status}")
-    except Exception as e:
-        print(f"⚠️  无法读取交易详情: {e}")
-    
-    # ========== 第7步: 被授权人签名交易 ==========
-    print(f"\n7️⃣  被授权人签名交易...")
-    
-    result = licensee.sign_pending_transaction(temp_file)
+    height = get_height()
+    result = licensee.prepare_and_sign_multisig(pending_tx)
     
     if not result:
-        print("❌ 交易签名失败")
+        print("❌ 添加燃料UTXO或签名失败")
         return False
     
+    # 只在结束时把完整签名的交易写入一次，供审计
+    audit_file = os.path.join(workdir, f"multisig_auth_{result[:8]}.json")
+    with open(audit_file, 'wb') as f:
+        f.write(orjson.dumps(pending_tx.to_dict(), option=orjson.OPT_INDENT_2))
+    print(f"  审计文件: {audit_file}")
+    
     print(f"✅ 授权交易已完全签名并提交")
     print(f"  交易ID: {result[:16]}...\n")
     
     # 等待挖矿完成
-    time.sleep(3)
+    wait_for_block(height, author, licensee)
     
     # ========== 第8步: 验证交易 ==========
     print("8️⃣  验证授权结果...")
@@ -179,32 +223,16 @@ def test_multisig_authorization():
         return False
 
 if __name__ == "__main__":
-    import subprocess
-    
-    # 在后台启动矿工进程
-    miner_process = subprocess.Popen(
-        [sys.executable, "cpc_miner.py"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        cwd=os.path.dirname(os.path.abspath(__file__))
-    )
-    time.sleep(3)
+    success = test_multisig_authorization()
     
-    try:
-        success = test_multisig_authorization()
-        
-        if success:
-            print("\n" + "="*60)
-            print("  🎉 所有测试通过!")
-            print("="*60)
-            sys.exit(0)
-        else:
-            print("\n" + "="*60)
-            print("  ❌ 测试失败")
-            print("="*60)
-            sys.exit(1)
-    finally:
-        # 关闭矿工进程
-        miner_process.terminate()
-        miner_process.wait(timeout=5)
+    if success:
+        print("\n" + "="*60)
+        print("  🎉 所有测试通过!")
+        print("="*60)
+        sys.exit(0)
+    else:
+        print("\n" + "="*60)
+        print("  ❌ 测试失败")
+        print("="*60)
+        sys.exit(1)
 
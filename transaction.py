@@ -3,25 +3,133 @@
 实现各种版权相关的交易类型
 """
 
+import os
+import sys
+import bisect
 import hashlib
 import time
-import json
+import orjson
 import ecdsa
 import base64
-from typing import List, Dict, Any, Optional, Tuple
-from utxo import UTXO, BlockchainUTXOManager, CopyrightPayload, TimeLockScript
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterable
+from utxo import UTXO, BlockchainUTXOManager, CopyrightPayload, TimeLockScript, COIN, to_sats, intern_type
+
+# coincurve 封装了 libsecp256k1（C实现），验证签名比纯Python的ecdsa快一到两个数量级；未安装时退回ecdsa
+try:
+    from coincurve import PublicKey as _CoincurvePublicKey
+except ImportError:
+    _CoincurvePublicKey = None
+
+try:
+    from blake3 import blake3 as _blake3
+except ImportError:
+    _blake3 = None
+
+# 交易ID的哈希函数：默认SHA-256；安装了blake3且设置 CPC_TXID_BLAKE3=1 时改用blake3（短输入时开销更低）
+# 注意：开启后交易ID的格式随之改变，同一网络中的节点和钱包必须使用相同的设置
+# hashlib.sha256 由OpenSSL实现，运行时按CPUID自动选用SHA-NI/AVX2等指令，无需另外的C扩展
+USE_BLAKE3_TXID = _blake3 is not None and os.environ.get("CPC_TXID_BLAKE3", "0") == "1"
+_txid_hash = _blake3 if USE_BLAKE3_TXID else hashlib.sha256
+
+
+def _sig_to_bytes(signature):
+    """签名转为原始字节（base64字符串解码，字节/None原样返回）"""
+    if isinstance(signature, str):
+        return base64.b64decode(signature)
+    return signature
+
+
+# secp256k1 群的阶
+_SECP256K1_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+
+def _sha1_digest32(message: bytes) -> bytes:
+    """ecdsa 默认的SHA-1摘要，左侧补零到32字节（与钱包签名时使用的哈希一致）"""
+    return hashlib.sha1(message).digest().rjust(32, b"\0")
+
+
+@lru_cache(maxsize=1024)
+def _message_digest(txid: str) -> bytes:
+    """
+    签名消息（交易ID）的摘要
+    
+    同一笔交易的所有输入、所有签名者都对同一个交易ID签名：按交易ID缓存，
+    每笔交易只哈希一次，验证时直接传入摘要
+    """
+    return _sha1_digest32(txid.encode())
+
+
+def _raw_sig_to_der(signature: bytes) -> bytes:
+    """
+    把64字节 r||s 签名转换为DER编码，供 libsecp256k1 验证
+    
+    libsecp256k1 只接受 low-S 形式的签名，而 ecdsa 生成的签名 s 可能大于 n/2；
+    (r, n - s) 与 (r, s) 对同一消息同样有效，转换时统一为 low-S
+    """
+    r = int.from_bytes(signature[:32], "big")
+    s = int.from_bytes(signature[32:], "big")
+    if s > _SECP256K1_N // 2:
+        s = _SECP256K1_N - s
+    body = b""
+    for value in (r, s):
+        data = value.to_bytes((value.bit_length() + 8) // 8, "big")
+        body += b"\x02" + bytes([len(data)]) + data
+    return b"\x30" + bytes([len(body)]) + body
+
+
+@lru_cache(maxsize=4096)
+def _load_verifying_key(signer_address: str):
+    """
+    解析签名者地址（base64编码的64字节公钥）为验证公钥
+    （coincurve.PublicKey，未安装时为ecdsa.VerifyingKey）
+    
+    进程级LRU缓存：每个区块都新建验证器，常见的签名者（多签参与方、水龙头、公司账户）
+    跨区块也只解析一次公钥
+    """
+    public_key_bytes = base64.b64decode(signer_address)
+    if _CoincurvePublicKey is not None:
+        return _CoincurvePublicKey(b"\x04" + public_key_bytes)
+    return ecdsa.VerifyingKey.from_string(public_key_bytes, curve=ecdsa.SECP256k1)
+
+
+def _sig_to_str(signature):
+    """签名转为base64字符串（仅在序列化为JSON时使用）"""
+    if isinstance(signature, (bytes, bytearray)):
+        return base64.b64encode(signature).decode()
+    return signature
+
+
+def _sig_to_txid_str(signature):
+    """签名在交易ID哈希中的表示：原始字节直接取十六进制（bytes.hex在C中完成，比base64编码快）"""
+    if isinstance(signature, (bytes, bytearray)):
+        return signature.hex()
+    return signature
+
+
+def _intern_address(address):
+    """
+    驻留地址字符串：内存池中大量交易引用同一批地址时只保留一份字符串对象，
+    集合/字典查找也能先按对象身份快速命中
+    """
+    return sys.intern(address) if type(address) is str else address
 
 
 class TransactionInput:
     """
     交易输入 - 引用之前的UTXO
     支持多签：每个输入可以由多个地址共同签名
+    
+    签名在内存中保存为原始字节，只在 to_dict()/from_dict() 与JSON交互时做base64编解码
     """
     
+    __slots__ = ("txid", "vout", "signature", "public_key", "signatures", "required_signers", "_unsigned")
+    
     def __init__(self, 
                  txid: str,                    # 引用的交易ID
                  vout: int,                    # 引用的输出索引
-                 signature: Optional[str] = None,     # 签名（可选，可能还未签名）
+                 signature: Optional[bytes] = None,   # 签名（可选，可能还未签名）
                  public_key: Optional[str] = None,    # 公钥（可选，可能还未签名）
                  required_signers: Optional[List[str]] = None):  # 需要签名的地址列表
         """
@@ -30,41 +138,57 @@ class TransactionInput:
         Args:
             txid: 要花费的UTXO所在的交易ID
             vout: 要花费的UTXO在该交易中的输出索引
-            signature: 对这个input的签名（单个签名，用于向后兼容）
+            signature: 对这个input的签名（原始字节或base64字符串；单个签名，用于向后兼容）
             public_key: 签名者的公钥（单个公钥，用于向后兼容）
             required_signers: 需要签名的地址列表（用于多签场景）
         """
         self.txid = txid
         self.vout = vout
+        signature = _sig_to_bytes(signature)
         self.signature = signature  # 向后兼容：单签
         self.public_key = public_key  # 向后兼容：单签
         
         # 多签支持：记录已有的签名
-        self.signatures: Dict[str, str] = {}  # key: 地址（公钥），value: 签名
+        # [(地址（公钥）, 签名（原始字节）)]，按地址保持有序：计算交易ID时直接按顺序使用，不必再排序
+        self.signatures: List[Tuple[str, bytes]] = []
         
         # 记录需要签名的地址列表
         if required_signers is None:
             # 如果没有指定，则使用 public_key 作为单个签名者
             if public_key:
-                self.required_signers = [public_key]
+                self.required_signers = [_intern_address(public_key)]
             else:
                 self.required_signers = []
         else:
-            self.required_signers = required_signers
+            self.required_signers = [_intern_address(signer) for signer in required_signers]
         
         # 初始化签名表
         if signature and public_key:
-            self.signatures[public_key] = signature
+            self.signatures.append((_intern_address(public_key), signature))
+        
+        self._refresh_unsigned()
+    
+    def _refresh_unsigned(self):
+        """重新计算还未签名的地址集合（整体替换 signatures 后调用）"""
+        signed = {addr for addr, _ in self.signatures}
+        self._unsigned = {signer for signer in self.required_signers if signer not in signed}
     
-    def add_signature(self, address: str, signature: str):
+    def add_signature(self, address: str, signature: bytes):
         """
         添加一个签名
         
         Args:
             address: 签名者地址（公钥）
-            signature: 签名
+            signature: 签名（原始字节或base64字符串）
         """
-        self.signatures[address] = signature
+        address = _intern_address(address)
+        entry = (address, _sig_to_bytes(signature))
+        i = bisect.bisect_left(self.signatures, (address,))
+        if i < len(self.signatures) and self.signatures[i][0] == address:
+            self.signatures[i] = entry  # 同一地址重复签名时替换
+        else:
+            self.signatures.insert(i, entry)
+        self._unsigned.discard(address)
     
     def is_fully_signed(self) -> bool:
         """
@@ -73,25 +197,33 @@ class TransactionInput:
         Returns:
             True 如果所有 required_signers 都已签名
         """
-        return all(signer in self.signatures for signer in self.required_signers)
+        return not self._unsigned
     
     def get_unsigned_signers(self) -> List[str]:
         """
         获取还未签名的地址列表
         
         Returns:
-            还未签名的地址列表
+            还未签名的地址列表（按 required_signers 中的顺序）
         """
-        return [signer for signer in self.required_signers if signer not in self.signatures]
+        if not self._unsigned:
+            return []
+        return [signer for signer in self.required_signers if signer in self._unsigned]
+    
+    def _txid_fields(self) -> tuple:
+        """参与交易ID计算的字段（按固定位置排列，不构造字典；多签签名已按地址有序）"""
+        return (self.txid, self.vout, _sig_to_txid_str(self.signature), self.public_key,
+                [(addr, _sig_to_txid_str(sig)) for addr, sig in self.signatures],
+                self.required_signers)
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
         return {
             "txid": self.txid,
             "vout": self.vout,
-            "signature": self.signature,  # 向后兼容
+            "signature": _sig_to_str(self.signature),  # 向后兼容
             "public_key": self.public_key,  # 向后兼容
-            "signatures": self.signatures,  # 多签
+            "signatures": {addr: _sig_to_str(sig) for addr, sig in self.signatures},  # 多签
             "required_signers": self.required_signers  # 多签
         }
     
@@ -107,13 +239,18 @@ class TransactionInput:
         )
         # 恢复多签信息
         if "signatures" in data:
-            inp.signatures = data["signatures"]
+            inp.signatures = sorted(
+                (_intern_address(addr), _sig_to_bytes(sig)) for addr, sig in data["signatures"].items()
+            )
+            inp._refresh_unsigned()
         return inp
 
 
 class TransactionOutput:
     """交易输出 - 创建新的UTXO"""
     
+    __slots__ = ("amount", "address", "script_pubkey", "utxo_type", "payload")
+    
     def __init__(self,
                  amount: float,           # CPC数量
                  address: str,            # 接收地址
@@ -133,9 +270,13 @@ class TransactionOutput:
         self.amount = amount
         self.address = address
         self.script_pubkey = script_pubkey
-        self.utxo_type = utxo_type
+        self.utxo_type = intern_type(utxo_type)
         self.payload = payload or {}
     
+    def _txid_fields(self) -> tuple:
+        """参与交易ID计算的字段（按固定位置排列，不构造字典）"""
+        return (self.amount, self.address, self.script_pubkey, self.utxo_type, self.payload)
+    
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
         return {
@@ -149,12 +290,65 @@ class TransactionOutput:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]):
         """从字典创建"""
+        payload = data.get("payload", {})
+        # 验证逻辑反复比较 payload["copyright_type"]，反序列化时一并驻留（值不变，不影响交易ID）
+        if payload and "copyright_type" in payload:
+            payload["copyright_type"] = intern_type(payload["copyright_type"])
         return cls(
             amount=data["amount"],
             address=data["address"],
             script_pubkey=data["script_pubkey"],
             utxo_type=data.get("utxo_type", "fuel"),
-            payload=data.get("payload", {})
+            payload=payload
+        )
+
+
+class AuthMetadata:
+    """
+    授权锁定交易的元数据
+    
+    固定字段用 __slots__ 保存，钱包端读写是属性访问；
+    交易中仍以 to_dict() 的字典形式存放，JSON格式不变
+    """
+    
+    __slots__ = ("licensee", "multisig", "author", "note")
+    
+    def __init__(self,
+                 licensee: Optional[str],
+                 multisig: bool,
+                 author: Optional[str],
+                 note: str = "授权期限固定为3个月"):
+        """
+        初始化授权元数据
+        
+        Args:
+            licensee: 被授权人地址
+            multisig: 是否为多签交易
+            author: 作者地址
+            note: 备注
+        """
+        self.licensee = licensee
+        self.multisig = multisig
+        self.author = author
+        self.note = note
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "licensee": self.licensee,
+            "multisig": self.multisig,
+            "author": self.author,
+            "note": self.note
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """从字典创建（缺失的字段为空）"""
+        return cls(
+            licensee=data.get("licensee"),
+            multisig=bool(data.get("multisig")),
+            author=data.get("author"),
+            note=data.get("note", "")
         )
 
 
@@ -175,6 +369,8 @@ class Transaction:
     TYPE_REDEMPTION = "redemption"                 # 赎回（阶段四）
     TYPE_SUB_LICENSE = "sub_license"               # 次级授权（阶段五）
     
+    __slots__ = ("inputs", "outputs", "tx_type", "metadata", "timestamp", "_txid", "_canonical_bytes")
+    
     def __init__(self,
                  inputs: List[TransactionInput],
                  outputs: List[TransactionOutput],
@@ -194,19 +390,35 @@ class Transaction:
         self.tx_type = tx_type
         self.metadata = metadata or {}
         self.timestamp = time.time() # 创建时间
-        self.txid = self.calculate_txid() # 交易ID
+        self._txid = None # 交易ID，第一次读取 txid 时计算
+        self._canonical_bytes = None # 规范序列化缓存（首次打包进区块时生成）
+    
+    @property
+    def txid(self) -> str:
+        """交易ID（惰性计算并缓存；add_signature 只把缓存置空，不立即重新序列化）"""
+        if self._txid is None:
+            self._txid = self.calculate_txid()
+        return self._txid
+    
+    @txid.setter
+    def txid(self, value: Optional[str]):
+        self._txid = value
     
     def calculate_txid(self) -> str:
-        """计算交易ID"""
-        tx_data = {
-            "inputs": [inp.to_dict() for inp in self.inputs],
-            "outputs": [out.to_dict() for out in self.outputs],
-            "tx_type": self.tx_type,
-            "timestamp": self.timestamp,
-            "metadata": self.metadata
-        }
-        tx_string = json.dumps(tx_data, sort_keys=True)
-        return hashlib.sha256(tx_string.encode()).hexdigest()
+        """
+        计算交易ID
+        
+        哈希输入是按固定位置排列的元组序列化结果：不必为每个输入/输出构造字典，
+        也只有payload、metadata这类自由结构的字典需要按键排序
+        """
+        tx_data = (
+            [inp._txid_fields() for inp in self.inputs],
+            [out._txid_fields() for out in self.outputs],
+            self.tx_type,
+            self.timestamp,
+            self.metadata
+        )
+        return _txid_hash(orjson.dumps(tx_data, option=orjson.OPT_SORT_KEYS)).hexdigest()
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -219,17 +431,34 @@ class Transaction:
             "metadata": self.metadata
         }
     
+    def canonical_bytes(self) -> bytes:
+        """
+        交易的规范序列化（orjson按键排序输出的 to_dict() 字节）
+        
+        交易打包进区块后不再变化，结果在首次调用时缓存，区块哈希直接拼接这些字节
+        
+        Returns:
+            规范序列化字节
+        """
+        if self._canonical_bytes is None:
+            self._canonical_bytes = orjson.dumps(self.to_dict(), option=orjson.OPT_SORT_KEYS)
+        return self._canonical_bytes
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]):
-        """从字典创建交易"""
-        tx = cls(
-            inputs=[TransactionInput.from_dict(inp) for inp in data["inputs"]],
-            outputs=[TransactionOutput.from_dict(out) for out in data["outputs"]],
-            tx_type=data.get("tx_type", cls.TYPE_FAUCET),
-            metadata=data.get("metadata", {})
-        )
+        """
+        从字典创建交易
+        
+        时间戳和交易ID都来自数据本身，不经过 __init__（避免读取当前时间后再被覆盖）
+        """
+        tx = cls.__new__(cls)
+        tx.inputs = [TransactionInput.from_dict(inp) for inp in data["inputs"]]
+        tx.outputs = [TransactionOutput.from_dict(out) for out in data["outputs"]]
+        tx.tx_type = data.get("tx_type", cls.TYPE_FAUCET)
+        tx.metadata = data.get("metadata") or {}
         tx.timestamp = data["timestamp"]
-        tx.txid = data["txid"]
+        tx._txid = data["txid"]
+        tx._canonical_bytes = None
         return tx
     
     def is_fully_signed(self) -> bool:
@@ -239,7 +468,8 @@ class Transaction:
         Returns:
             True 如果所有输入都已被完全签名
         """
-        return all(inp.is_fully_signed() for inp in self.inputs if inp.required_signers)
+        # 没有 required_signers 的输入未签名集合为空，is_fully_signed 直接为True，不必另外过滤
+        return all(inp.is_fully_signed() for inp in self.inputs)
     
     def get_unsigned_signers(self) -> List[tuple]:
         """
@@ -256,7 +486,24 @@ class Transaction:
                     unsigned.append((i, unsigned_addrs))
         return unsigned
     
-    def add_signature(self, input_index: int, signer_address: str, signature: str):
+    def output_sats(self) -> int:
+        """输出总额（整数最小单位）"""
+        return sum(to_sats(out.amount) for out in self.outputs)
+    
+    def compute_fee(self, utxo_lookup: Callable[[str, int], int]) -> int:
+        """
+        计算手续费：输入总额 - 输出总额（整数最小单位）
+        
+        Args:
+            utxo_lookup: 根据 (txid, vout) 返回被花费UTXO金额（整数最小单位）的函数
+            
+        Returns:
+            手续费（整数最小单位），为负数表示输出超过输入
+        """
+        input_total = sum(utxo_lookup(inp.txid, inp.vout) for inp in self.inputs)
+        return input_total - self.output_sats()
+    
+    def add_signature(self, input_index: int, signer_address: str, signature: bytes):
         """
         为特定输入添加签名
         
@@ -267,8 +514,24 @@ class Transaction:
         """
         if input_index < len(self.inputs):
             self.inputs[input_index].add_signature(signer_address, signature)
-            # 重新计算交易ID
-            self.txid = self.calculate_txid()
+            # 交易ID在下次读取时重新计算，连续添加N个签名只序列化一次
+            self._txid = None
+            self._canonical_bytes = None
+
+
+def _addresses_by_work(copyright_inputs: Dict[str, List[Tuple[UTXO, CopyrightPayload]]],
+                       copyright_type: str) -> Dict[str, str]:
+    """某一版权类型的输入：作品哈希 -> 输入UTXO地址（同一作品有多个输入时以最后一个为准）"""
+    return {utxo.payload.get("work_hash"): utxo.address
+            for utxo, _ in copyright_inputs.get(copyright_type, ())}
+
+
+def _allowed_transitions(state_machine: Dict[str, List[str]], remintable: frozenset) -> Dict[str, frozenset]:
+    """由状态机生成 源状态 -> 允许的目标状态集合（可重新铸造的类型包含自身）"""
+    return {
+        src: frozenset(dests) | (frozenset({src}) if src in remintable else frozenset())
+        for src, dests in state_machine.items()
+    }
 
 
 class TransactionValidator:
@@ -287,15 +550,43 @@ class TransactionValidator:
         "secondary": []                 # 次级不能转换（终端状态）
     }
     
-    def __init__(self, blockchain: List):
+    # 允许重新铸造（相同类型）的版权类型
+    REMINTABLE_TYPES = frozenset({"sovereignty", "proof"})
+    
+    # 每个源状态允许到达的全部目标状态（状态转换 + 可重新铸造类型自身），验证时只做一次集合查找
+    ALLOWED_TRANSITIONS = _allowed_transitions(COPYRIGHT_STATE_MACHINE, REMINTABLE_TYPES)
+    
+    # preverify_signatures 中待验证的签名达到这个数量时才启用线程池
+    PARALLEL_SIGNATURES_MIN = 16
+    
+    def __init__(self, blockchain: List, utxo_manager: Optional[BlockchainUTXOManager] = None):
         """
         初始化验证器
         
         Args:
             blockchain: 区块链列表（CPCBlock对象列表）
+            utxo_manager: 共用的UTXO管理器（可选；节点长期持有一个，增量扫描结果在多次验证间复用）
         """
         # 使用基于区块扫描的UTXO管理器，而不是全局UTXO池
-        self.utxo_manager = BlockchainUTXOManager(blockchain)
+        if utxo_manager is None:
+            utxo_manager = BlockchainUTXOManager(blockchain)
+        self.utxo_manager = utxo_manager
+        # 锁定脚本字符串 -> 解析结果；同一验证器验证的交易经常花费相同脚本的UTXO
+        self._script_cache: Dict[str, TimeLockScript] = {}
+        # 已验证通过的 (签名者地址, 签名, 交易ID)：同一签名者的多个输入通常带着同一个签名，
+        # 也可能在同一批次中被重复验证，相同的三元组只做一次椭圆曲线运算
+        self._verified_sigs: set = set()
+    
+    def _parse_script(self, script_str: str) -> TimeLockScript:
+        """
+        解析锁定脚本（按脚本字符串缓存）
+        
+        缓存的脚本对象只用于 can_spend 判断，调用方不得修改
+        """
+        script = self._script_cache.get(script_str)
+        if script is None:
+            script = self._script_cache[script_str] = TimeLockScript.from_string(script_str)
+        return script
     
     def _validate_copyright_state_transition(self, 
                                             input_copyright_type: str,
@@ -316,29 +607,23 @@ class TransactionValidator:
             (是否合法, 错误信息)
         """
 
-        # 允许重新铸造（相同类型）
-        # sovereignty 和 proof 都可以重新铸造，secondary 不能
+        if output_copyright_type in self.ALLOWED_TRANSITIONS.get(input_copyright_type, ()):
+            return True, ""
+        
+        # 以下只在验证失败时执行，生成错误信息
         if input_copyright_type == output_copyright_type:
-            if input_copyright_type in ["sovereignty", "proof"]:
-                return True, ""
-            else:
-                return False, f"{input_copyright_type} 不能重新铸造"
+            return False, f"{input_copyright_type} 不能重新铸造"
         
-        # 检查是否允许的状态转换
         allowed_transitions = self.COPYRIGHT_STATE_MACHINE.get(input_copyright_type, [])
-        
-        if output_copyright_type not in allowed_transitions:
-            return False, (
-                f"非法的版权状态转换: {input_copyright_type} -> {output_copyright_type}. "
-                f"允许的转换: {allowed_transitions} 或重新铸造（相同类型）"
-            )
-        
-        return True, ""
+        return False, (
+            f"非法的版权状态转换: {input_copyright_type} -> {output_copyright_type}. "
+            f"允许的转换: {allowed_transitions} 或重新铸造（相同类型）"
+        )
     
     def _validate_address_ownership(self,
                                    tx_type: str,
-                                   inputs: List[TransactionInput],
-                                   outputs: List[TransactionOutput]) -> Tuple[bool, str]:
+                                   outputs: List[TransactionOutput],
+                                   copyright_inputs: Dict[str, List[Tuple[UTXO, CopyrightPayload]]]) -> Tuple[bool, str]:
         """
         验证交易中的地址所有权约束
         
@@ -350,23 +635,20 @@ class TransactionValidator:
         
         Args:
             tx_type: 交易类型
-            inputs: 交易输入列表
             outputs: 交易输出列表
+            copyright_inputs: validate_transaction 遍历输入时按版权类型归类的 (UTXO, payload)
             
         Returns:
             (是否有效, 错误信息)
         """
+        # 每条规则都是把输出地址与同一作品的版权输入地址比较：没有版权输入时无需遍历输出
+        if not copyright_inputs:
+            return True, ""
+        
         if tx_type == Transaction.TYPE_AUTH_LOCK:
             # 交易 B：授权锁定
             # 验证 sovereignty 输入地址 == sovereignty 输出地址
-            sovereignty_inputs = {}
-            for inp in inputs:
-                utxo = self.utxo_manager.get_utxo(inp.txid, inp.vout, scan_months=3)
-                if utxo and utxo.utxo_type == "copyright":
-                    payload = utxo.payload
-                    if payload.get("copyright_type") == "sovereignty":
-                        # 记录 sovereignty 输入的地址
-                        sovereignty_inputs[utxo.payload.get("work_hash")] = utxo.address
+            sovereignty_inputs = _addresses_by_work(copyright_inputs, "sovereignty")
             
             # 检查 sovereignty 输出的地址是否匹配
             for out in outputs:
@@ -386,20 +668,8 @@ class TransactionValidator:
         elif tx_type == Transaction.TYPE_RENEWAL:
             # 交易 D：续期
             # 验证 sovereignty 和 proof 输入地址分别等于对应的输出地址
-            sovereignty_inputs = {}
-            proof_inputs = {}
-            
-            for inp in inputs:
-                utxo = self.utxo_manager.get_utxo(inp.txid, inp.vout, scan_months=3)
-                if utxo and utxo.utxo_type == "copyright":
-                    payload = utxo.payload
-                    copyright_type = payload.get("copyright_type")
-                    work_hash = payload.get("work_hash")
-                    
-                    if copyright_type == "sovereignty":
-                        sovereignty_inputs[work_hash] = utxo.address
-                    elif copyright_type == "proof":
-                        proof_inputs[work_hash] = utxo.address
+            sovereignty_inputs = _addresses_by_work(copyright_inputs, "sovereignty")
+            proof_inputs = _addresses_by_work(copyright_inputs, "proof")
             
             # 检查输出地址
             for out in outputs:
@@ -428,15 +698,7 @@ class TransactionValidator:
         elif tx_type == Transaction.TYPE_SUB_LICENSE:
             # 交易 E：次级授权
             # 验证 proof UTXO（C1）的输入地址等于输出地址
-            proof_inputs = {}
-            
-            for inp in inputs:
-                utxo = self.utxo_manager.get_utxo(inp.txid, inp.vout, scan_months=3)
-                if utxo and utxo.utxo_type == "copyright":
-                    payload = utxo.payload
-                    if payload.get("copyright_type") == "proof":
-                        work_hash = payload.get("work_hash")
-                        proof_inputs[work_hash] = utxo.address
+            proof_inputs = _addresses_by_work(copyright_inputs, "proof")
             
             # 检查 proof 输出地址是否匹配（C1 重新铸造）
             for out in outputs:
@@ -457,15 +719,7 @@ class TransactionValidator:
         elif tx_type == Transaction.TYPE_AUTH_ACTIVATE:
             # 交易 C：授权激活
             # 验证 instruction 到 proof 的转换，输入地址必须等于输出地址
-            instruction_inputs = {}
-            
-            for inp in inputs:
-                utxo = self.utxo_manager.get_utxo(inp.txid, inp.vout, scan_months=3)
-                if utxo and utxo.utxo_type == "copyright":
-                    payload = utxo.payload
-                    if payload.get("copyright_type") == "instruction":
-                        work_hash = payload.get("work_hash")
-                        instruction_inputs[work_hash] = utxo.address
+            instruction_inputs = _addresses_by_work(copyright_inputs, "instruction")
             
             # 检查 proof 输出地址是否匹配
             for out in outputs:
@@ -486,7 +740,73 @@ class TransactionValidator:
         return True, ""
     
     
-    def validate_transaction(self, transaction: Transaction) -> Tuple[bool, str]:
+    def preverify_signatures(self, transactions: List[Transaction], max_workers: Optional[int] = None) -> int:
+        """
+        用线程池并行验证一组交易中的全部签名，验证通过的记入 verify_batch 的缓存
+        
+        之后逐笔 validate_transaction 时这些签名直接命中缓存；无效的签名不记录，
+        由逐笔验证重新验证并报告具体是哪笔交易。libsecp256k1 经cffi调用时释放GIL，
+        线程可以真正并行；退回纯Python的ecdsa时并行没有收益，直接跳过
+        
+        Args:
+            transactions: 交易列表
+            max_workers: 线程数（默认CPU核数）
+            
+        Returns:
+            本次新验证通过的签名数
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if _CoincurvePublicKey is None or max_workers <= 1:
+            return 0
+        
+        pending = set()
+        for tx in transactions:
+            txid = tx.txid
+            for inp in tx.inputs:
+                if inp.signatures:
+                    for signer_address, signature in inp.signatures:
+                        pending.add((signer_address, _sig_to_bytes(signature), txid))
+                elif inp.public_key and inp.signature:
+                    address = self._public_key_to_address(inp.public_key)
+                    pending.add((address, _sig_to_bytes(inp.signature), txid))
+        pending -= self._verified_sigs
+        if len(pending) < self.PARALLEL_SIGNATURES_MIN:
+            return 0
+        
+        # 每个线程验证一段连续的签名，避免为每个签名提交一个任务
+        pending = list(pending)
+        step = -(-len(pending) // max_workers)
+        chunks = [pending[i:i + step] for i in range(0, len(pending), step)]
+        
+        def verify_chunk(chunk):
+            return [triple for triple in chunk if self._verify_single_signature(*triple)]
+        
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            verified = [triple for valid in executor.map(verify_chunk, chunks) for triple in valid]
+        self._verified_sigs.update(verified)
+        return len(verified)
+    
+    def prefetch_utxos(self, transactions: List[Transaction],
+                       now: Optional[int] = None) -> Dict[Tuple[str, int], UTXO]:
+        """
+        一次扫描区块，取得一组交易所有输入引用的UTXO
+        
+        Args:
+            transactions: 交易列表
+            now: 当前时间戳（可选，默认取当前时间）
+            
+        Returns:
+            {(txid, vout): UTXO}，可传给 validate_transaction 的 utxo_map 参数
+        """
+        needed = {(inp.txid, inp.vout) for tx in transactions for inp in tx.inputs}
+        if not needed:
+            return {}
+        return self.utxo_manager.get_utxos_bulk(needed, scan_months=3, now=now)
+    
+    def validate_transaction(self, transaction: Transaction,
+                             utxo_map: Optional[Dict[Tuple[str, int], UTXO]] = None,
+                             now: Optional[int] = None) -> Tuple[bool, str]:
         """
         验证交易
         
@@ -497,6 +817,11 @@ class TransactionValidator:
         3. 交易类别匹配和 Payload 一致性 - 验证版权 UTXO 的 payload 数据完整性
         4. 强制地址所有权检查（关键） - 确保主权和已证明的权利不会被非法转移
         
+        Args:
+            transaction: 待验证的交易
+            utxo_map: 预取的 {(txid, vout): UTXO}（见 prefetch_utxos）；为None时为本交易单独扫描一次
+            now: 当前时间戳，用于时间锁判断（可选；批量验证时由调用方统一取一次）
+        
         Returns:
             (是否有效, 错误信息)
         """
@@ -517,87 +842,94 @@ class TransactionValidator:
         if transaction.tx_type == Transaction.TYPE_COPYRIGHT_REG:
             return self._validate_copyright_register(transaction)
         
+        if now is None:
+            now = int(time.time())
+        if utxo_map is None:
+            utxo_map = self.prefetch_utxos([transaction], now)
+        
         input_amount = 0
+        # 版权输入按类型归类（保持输入顺序），后续的类型校验和地址所有权检查直接使用，不再重新遍历输入
+        copyright_inputs: Dict[str, List[Tuple[UTXO, CopyrightPayload]]] = {}
         # 遍历所有的交易输入
         for inp in transaction.inputs:
             # 1. 验证输入是否存在且未花费
-            utxo = self.utxo_manager.get_utxo(inp.txid, inp.vout, scan_months=3) # 一笔待花费UTXO
+            utxo = utxo_map.get((inp.txid, inp.vout)) # 一笔待花费UTXO
             if not utxo:
                 return False, f"UTXO {inp.txid}:{inp.vout} 不存在或已被花费"
             
             # 2. 验证签名
-            if not self._verify_signature(inp, transaction):
+            if not self._verify_signature(inp, transaction, utxo):
                 return False, f"输入 {inp.txid}:{inp.vout} 的签名验证失败"
             
             # 3. 验证锁定脚本
-            script = TimeLockScript.from_string(utxo.script_pubkey) # 锁定脚本
+            script = self._parse_script(utxo.script_pubkey) # 锁定脚本
             address = self._public_key_to_address(inp.public_key) # 锁定地址
             
             # 获取授权到期时间（如果是版权UTXO，动态计算）
             end_time = None
             if utxo.utxo_type == "copyright" and utxo.payload: # 如果是版权交易
                 # 从CopyrightPayload动态计算到期时间（固定3个月）
-                from utxo import CopyrightPayload
-                payload = CopyrightPayload.from_dict(utxo.payload)
+                payload = utxo.parsed_payload()
                 end_time = payload.get_end_time() # 到期时间
+                copyright_inputs.setdefault(payload.copyright_type, []).append((utxo, payload))
             
-            if not script.can_spend(int(time.time()), [address], end_time=end_time):
+            if not script.can_spend(now, [address], end_time=end_time):
                 return False, f"UTXO {inp.txid}:{inp.vout} 的锁定条件未满足（可能已过期）"
             
-            input_amount += utxo.amount
+            input_amount += utxo.amount_sats
         
         # 4. 验证输入输出金额
-        output_amount = sum(out.amount for out in transaction.outputs) # 输出金额
+        output_amount = transaction.output_sats() # 输出金额
         
-        # 允许有小额手续费消耗
+        # 允许有小额手续费消耗（按整数最小单位比较，避免浮点累加误差）
         if output_amount > input_amount:
-            return False, f"输出金额({output_amount})超过输入金额({input_amount})"
+            return False, f"输出金额({output_amount / COIN})超过输入金额({input_amount / COIN})"
         
         # 5. 根据交易类型进行特定验证（包含状态机验证）
         if transaction.tx_type == Transaction.TYPE_AUTH_LOCK:
-            is_valid, error_msg = self._validate_authorization_lock(transaction)
+            is_valid, error_msg = self._validate_authorization_lock(transaction, copyright_inputs)
             if not is_valid:
                 return False, error_msg
             
             # 强制地址所有权检查
             is_valid, error_msg = self._validate_address_ownership(
-                transaction.tx_type, transaction.inputs, transaction.outputs
+                transaction.tx_type, transaction.outputs, copyright_inputs
             )
             if not is_valid:
                 return False, error_msg
         
         elif transaction.tx_type == Transaction.TYPE_AUTH_ACTIVATE:
-            is_valid, error_msg = self._validate_authorization_activate(transaction)
+            is_valid, error_msg = self._validate_authorization_activate(transaction, copyright_inputs)
             if not is_valid:
                 return False, error_msg
             
             # 强制地址所有权检查
             is_valid, error_msg = self._validate_address_ownership(
-                transaction.tx_type, transaction.inputs, transaction.outputs
+                transaction.tx_type, transaction.outputs, copyright_inputs
             )
             if not is_valid:
                 return False, error_msg
         
         elif transaction.tx_type == Transaction.TYPE_RENEWAL:
-            is_valid, error_msg = self._validate_renewal(transaction)
+            is_valid, error_msg = self._validate_renewal(transaction, copyright_inputs)
             if not is_valid:
                 return False, error_msg
             
             # 强制地址所有权检查
             is_valid, error_msg = self._validate_address_ownership(
-                transaction.tx_type, transaction.inputs, transaction.outputs
+                transaction.tx_type, transaction.outputs, copyright_inputs
             )
             if not is_valid:
                 return False, error_msg
         
         elif transaction.tx_type == Transaction.TYPE_SUB_LICENSE:
-            is_valid, error_msg = self._validate_sub_license(transaction)
+            is_valid, error_msg = self._validate_sub_license(transaction, copyright_inputs)
             if not is_valid:
                 return False, error_msg
             
             # 强制地址所有权检查
             is_valid, error_msg = self._validate_address_ownership(
-                transaction.tx_type, transaction.inputs, transaction.outputs
+                transaction.tx_type, transaction.outputs, copyright_inputs
             )
             if not is_valid:
                 return False, error_msg
@@ -610,9 +942,8 @@ class TransactionValidator:
         if len(transaction.inputs) != 0:
             return False, "水龙头交易不应有输入"
         
-        # 每次最多领取10 CPC
-        total_output = sum(out.amount for out in transaction.outputs)
-        if total_output > 10:
+        # 每次最多领取10 CPC（整数最小单位比较）
+        if transaction.output_sats() > 10 * COIN:
             return False, "水龙头单次最多发放10 CPC"
         
         # TODO: 可以添加地址领取频率限制
@@ -639,17 +970,11 @@ class TransactionValidator:
         
         return True, "版权注册交易验证成功"
     
-    def _validate_authorization_lock(self, transaction: Transaction) -> Tuple[bool, str]:
+    def _validate_authorization_lock(self, transaction: Transaction,
+                                     copyright_inputs: Dict[str, List[Tuple[UTXO, CopyrightPayload]]]) -> Tuple[bool, str]:
         """验证授权锁定交易"""
         # 必须包含版权主权UTXO作为输入
-        sovereignty_input = None
-        for inp in transaction.inputs:
-            utxo = self.utxo_manager.get_utxo(inp.txid, inp.vout, scan_months=3)
-            if utxo and utxo.utxo_type == "copyright":
-                payload = utxo.payload
-                if payload.get("copyright_type") == "sovereignty":
-                    sovereignty_input = payload.get("copyright_type")
-                    break
+        sovereignty_input = "sovereignty" if copyright_inputs.get("sovereignty") else None
         
         if not sovereignty_input:
             return False, "授权锁定交易必须包含版权主权UTXO作为输入"
@@ -690,26 +1015,21 @@ class TransactionValidator:
         
         return True, "授权锁定交易验证成功"
     
-    def _validate_authorization_activate(self, transaction: Transaction) -> Tuple[bool, str]:
+    def _validate_authorization_activate(self, transaction: Transaction,
+                                         copyright_inputs: Dict[str, List[Tuple[UTXO, CopyrightPayload]]]) -> Tuple[bool, str]:
         """验证授权激活交易"""
         # 必须包含授权指令UTXO作为输入
         instruction_input = None
         work_hash = None
         
-        for inp in transaction.inputs:
-            utxo = self.utxo_manager.get_utxo(inp.txid, inp.vout, scan_months=3)
-            if utxo and utxo.utxo_type == "copyright":
-                payload = utxo.payload
-                if payload.get("copyright_type") == "instruction":
-                    instruction_input = payload.get("copyright_type")
-                    work_hash = payload.get("work_hash")
-                    
-                    # 检查授权是否已过期（动态计算，固定3个月）
-                    from utxo import CopyrightPayload
-                    instruction_payload = CopyrightPayload.from_dict(payload)
-                    if instruction_payload.is_expired():
-                        return False, "授权指令UTXO已过期（授权期限固定为3个月）"
-                    break
+        if copyright_inputs.get("instruction"):
+            _, instruction_payload = copyright_inputs["instruction"][0]
+            instruction_input = "instruction"
+            work_hash = instruction_payload.work_hash
+            
+            # 检查授权是否已过期（动态计算，固定3个月）
+            if instruction_payload.is_expired():
+                return False, "授权指令UTXO已过期（授权期限固定为3个月）"
         
         if not instruction_input:
             return False, "授权激活交易必须包含授权指令UTXO作为输入"
@@ -737,24 +1057,19 @@ class TransactionValidator:
         
         return True, "授权激活交易验证成功"
     
-    def _validate_renewal(self, transaction: Transaction) -> Tuple[bool, str]:
+    def _validate_renewal(self, transaction: Transaction,
+                          copyright_inputs: Dict[str, List[Tuple[UTXO, CopyrightPayload]]]) -> Tuple[bool, str]:
         """验证续期交易"""
         # 必须包含旧的证明UTXO
         proof_input = None
         
-        for inp in transaction.inputs:
-            utxo = self.utxo_manager.get_utxo(inp.txid, inp.vout, scan_months=3)
-            if utxo and utxo.utxo_type == "copyright":
-                payload = utxo.payload
-                if payload.get("copyright_type") == "proof":
-                    proof_input = payload.get("copyright_type")
-                    
-                    # 验证是否在到期前续期（动态计算，固定3个月）
-                    from utxo import CopyrightPayload
-                    copyright_payload = CopyrightPayload.from_dict(payload)
-                    if copyright_payload.is_expired():
-                        return False, "证明UTXO已过期，无法续期"
-                    break
+        if copyright_inputs.get("proof"):
+            _, copyright_payload = copyright_inputs["proof"][0]
+            proof_input = "proof"
+            
+            # 验证是否在到期前续期（动态计算，固定3个月）
+            if copyright_payload.is_expired():
+                return False, "证明UTXO已过期，无法续期"
         
         if not proof_input:
             return False, "续期交易必须包含证明UTXO作为输入"
@@ -778,20 +1093,17 @@ class TransactionValidator:
         
         return True, "续期交易验证成功"
     
-    def _validate_sub_license(self, transaction: Transaction) -> Tuple[bool, str]:
+    def _validate_sub_license(self, transaction: Transaction,
+                              copyright_inputs: Dict[str, List[Tuple[UTXO, CopyrightPayload]]]) -> Tuple[bool, str]:
         """验证次级授权交易"""
         # 必须包含C1的证明UTXO
         c1_proof_input = None
         c1_proof_payload = None
         
-        for inp in transaction.inputs:
-            utxo = self.utxo_manager.get_utxo(inp.txid, inp.vout, scan_months=3)
-            if utxo and utxo.utxo_type == "copyright":
-                payload = utxo.payload
-                if payload.get("copyright_type") == "proof":
-                    c1_proof_input = payload.get("copyright_type")
-                    c1_proof_payload = payload
-                    break
+        if copyright_inputs.get("proof"):
+            c1_utxo, _ = copyright_inputs["proof"][0]
+            c1_proof_input = "proof"
+            c1_proof_payload = c1_utxo.payload
         
         if not c1_proof_input:
             return False, "次级授权交易必须包含主授权的证明UTXO"
@@ -799,16 +1111,18 @@ class TransactionValidator:
         # 必须重新铸造C1的UTXO和创建C2的UTXO
         c1_outputs = []  # C1重新铸造的proof UTXO
         c2_outputs = []   # C2的secondary UTXO
+        # 按版权类型直接查到输出所属的列表，其他类型不收集
+        buckets = {"proof": c1_outputs, "secondary": c2_outputs}
         
         for out in transaction.outputs:
             if out.utxo_type == "copyright":
-                output_type = out.payload.get("copyright_type")
-                if output_type == "proof" and not out.payload.get("parent_utxo"):
-                    # C1重新铸造的proof UTXO（没有parent_utxo）
-                    c1_outputs.append(out)
-                elif output_type == "secondary":
-                    # C2的secondary UTXO
-                    c2_outputs.append(out)
+                bucket = buckets.get(out.payload.get("copyright_type"))
+                if bucket is None:
+                    continue
+                # C1重新铸造的proof UTXO没有parent_utxo
+                if bucket is c1_outputs and out.payload.get("parent_utxo"):
+                    continue
+                bucket.append(out)
         
         if len(c1_outputs) == 0:
             return False, "次级授权必须重新铸造C1的证明UTXO"
@@ -835,39 +1149,49 @@ class TransactionValidator:
                 return False, f"C2次级授权验证失败: {error_msg}"
         
         # 验证C2的权利范围是C1的子集
-        c1_rights = set(c1_proof_payload.get("rights_scope", []))
+        c1_rights = frozenset(c1_proof_payload.get("rights_scope", []))
+        checked_scopes = set()  # 已确认是C1子集的权利范围：多个C2输出范围相同时只判断一次
         for c2_out in c2_outputs:
-            c2_rights = set(c2_out.payload.get("rights_scope", []))
-            if not c2_rights.issubset(c1_rights):
+            scope = tuple(c2_out.payload.get("rights_scope", ()))
+            if scope in checked_scopes:
+                continue
+            if not c1_rights.issuperset(scope):
                 return False, "C2的权利范围必须是C1的子集"
+            checked_scopes.add(scope)
         
         return True, "次级授权交易验证成功"
     
-    def _verify_signature(self, inp: TransactionInput, transaction: Transaction) -> bool:
+    def _verify_signature(self, inp: TransactionInput, transaction: Transaction,
+                          utxo: Optional[UTXO] = None) -> bool:
         """
         验证交易输入的签名
         支持单签和多签
         
+        Args:
+            inp: 交易输入
+            transaction: 交易对象
+            utxo: 该输入花费的UTXO（调用方已取得时传入，避免重新扫描区块）
+        
         返回：True 如果所有必要的签名都有效
         """
         try:
             # 获取UTXO
-            utxo = self.utxo_manager.get_utxo(inp.txid, inp.vout, scan_months=3)
+            if utxo is None:
+                utxo = self.utxo_manager.get_utxo(inp.txid, inp.vout, scan_months=3)
             if not utxo:
                 return False
             
             # 如果有多签信息，验证多签
             if inp.signatures:
-                # 多签验证：验证所有已签名的地址都对应有效的签名
-                for signer_address, signature_str in inp.signatures.items():
-                    if not self._verify_single_signature(signer_address, signature_str, transaction):
-                        return False
-                
-                # 检查是否所有必要的地址都已签名
+                # 检查是否所有必要的地址都已签名（不需要椭圆曲线运算，先做）
                 if not inp.is_fully_signed():
                     return False
                 
-                return True
+                # 多签验证：验证所有已签名的地址都对应有效的签名
+                txid = transaction.txid
+                return self.verify_batch(
+                    (signer_address, signature, txid) for signer_address, signature in inp.signatures
+                )
             
             # 否则，验证单签（向后兼容）
             if not inp.public_key or not inp.signature:
@@ -879,32 +1203,57 @@ class TransactionValidator:
                 return False
             
             # 验证签名
-            return self._verify_single_signature(address, inp.signature, transaction)
+            return self.verify_batch([(address, inp.signature, transaction.txid)])
         
         except Exception as e:
             print(f"签名验证异常: {e}")
             return False
     
-    def _verify_single_signature(self, signer_address: str, signature_str: str, transaction: Transaction) -> bool:
+    def verify_batch(self, triples: Iterable[Tuple[str, bytes, str]]) -> bool:
+        """
+        验证一组签名，全部有效时返回True
+        
+        相同的 (签名者地址, 签名, 交易ID) 只验证一次，已经验证通过的直接跳过；
+        遇到第一个无效签名即返回False
+        
+        Args:
+            triples: (签名者地址（公钥）, 签名（原始字节）, 交易ID) 的序列
+            
+        Returns:
+            True 如果所有签名都有效
+        """
+        verified = self._verified_sigs
+        for signer_address, signature, txid in triples:
+            key = (signer_address, _sig_to_bytes(signature), txid)
+            if key in verified:
+                continue
+            if not self._verify_single_signature(signer_address, key[1], txid):
+                return False
+            verified.add(key)
+        return True
+    
+    def _verify_single_signature(self, signer_address: str, signature: bytes, txid: str) -> bool:
         """
         验证单个签名
         
         Args:
             signer_address: 签名者地址（公钥）
-            signature_str: 签名字符串（base64）
-            transaction: 交易对象
+            signature: 签名（原始字节；调用方已完成base64解码）
+            txid: 被签名的交易ID
             
         Returns:
             True 如果签名有效
         """
         try:
-            public_key_bytes = base64.b64decode(signer_address)
-            signature_bytes = base64.b64decode(signature_str)
+            # 公钥的解码和解析按地址缓存在 _load_verifying_key 中，这里不做任何base64解码
+            vk = _load_verifying_key(signer_address)
+            digest = _message_digest(txid)
             
-            vk = ecdsa.VerifyingKey.from_string(public_key_bytes, curve=ecdsa.SECP256k1)
-            message = transaction.txid.encode()
-            
-            return vk.verify(signature_bytes, message)
+            if _CoincurvePublicKey is not None:
+                if len(signature) != 64:
+                    return False
+                return vk.verify(_raw_sig_to_der(signature), digest, hasher=None)
+            return vk.verify_digest(signature, digest)
         except Exception as e:
             print(f"单个签名验证异常: {e}")
             return False
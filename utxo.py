@@ -5,24 +5,49 @@ CPC (Copyright Proof Coin) - 版权凭证币
 这个模块实现了基于UTXO模型的核心数据结构
 """
 
+import sys
+import threading
 import time
-from typing import Optional, List, Dict, Any
+from collections import deque
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 
 # 授权期限常量：固定3个月（90天）
 AUTHORIZATION_DURATION_SECONDS = 90 * 24 * 3600  # 3个月 = 90天
 
+# 金额精度：1 CPC = 10^8 最小单位（聪）
+# 链上和接口中的金额仍为浮点数CPC，矿工节点内部的金额运算使用整数
+COIN = 10 ** 8
+
+
+def to_sats(amount: float) -> int:
+    """把CPC金额转换为整数最小单位"""
+    return int(round(amount * COIN))
+
+
 # 锁定脚本类型常量
 SCRIPT_TYPE_P2PKH = "P2PKH"          # Pay-to-Public-Key-Hash（单签）
 SCRIPT_TYPE_MULTISIG = "MULTISIG"    # 多重签名
 SCRIPT_TYPE_TIME_LOCK = "TIMELOCK"   # 时间锁
 
 
+def intern_type(value):
+    """
+    驻留类型字符串（utxo_type / copyright_type）：经JSON往返得到的新字符串对象
+    与源码中的字面量成为同一对象，验证热路径上的 == 比较按身份直接命中
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
 class UTXO:
     """
     UTXO (未花费交易输出) 类
     每个UTXO代表一个可花费的输出，可以是fuel（系统分发的CPC）或copyright（版权UTXO）
     """
     
+    # 扫描区块时每个输出都会创建一个UTXO对象，用 __slots__ 省去每个实例的属性字典
+    __slots__ = ("txid", "vout", "amount", "amount_sats", "address", "script_pubkey", "utxo_type",
+                 "payload", "created_time", "_parsed_payload")
+    
     def __init__(self, 
                  txid: str,           # 交易ID
                  vout: int,           # 输出索引
@@ -46,11 +71,13 @@ class UTXO:
         self.txid = txid
         self.vout = vout
         self.amount = amount
+        self.amount_sats = to_sats(amount) # 整数金额（最小单位）
         self.address = address
         self.script_pubkey = script_pubkey
-        self.utxo_type = utxo_type
+        self.utxo_type = intern_type(utxo_type)
         self.payload = payload or {}
         self.created_time = time.time() # 创建时间
+        self._parsed_payload = None # parsed_payload() 的缓存
         
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -80,8 +107,22 @@ class UTXO:
         utxo.created_time = data.get("created_time", time.time())
         return utxo
     
+    def parsed_payload(self) -> Optional["CopyrightPayload"]:
+        """
+        把 payload 解析为 CopyrightPayload（首次调用时解析并缓存）
+        
+        同一个UTXO被多笔交易引用时（如验证同一区块中相互冲突的交易）只解析一次；
+        返回的对象是共享的，调用方只读不改
+        
+        Returns:
+            CopyrightPayload对象，没有payload时返回None
+        """
+        if self._parsed_payload is None and self.payload:
+            self._parsed_payload = CopyrightPayload.from_dict(self.payload)
+        return self._parsed_payload
+    
     def get_identifier(self) -> str:
-        """获取UTXO的唯一标识符"""
+        """获取UTXO的唯一标识符（字符串形式，用于展示和JSON；集合内部以 (txid, vout) 元组为键）"""
         return f"{self.txid}:{self.vout}" # 交易id:输出索引
 
 
@@ -92,12 +133,15 @@ class CopyrightPayload:
     注意：授权期限固定为3个月，从UTXO创建时间（created_at）开始计算
     """
     
+    __slots__ = ("work_hash", "work_title", "author", "copyright_type",
+                 "rights_scope", "parent_utxo", "metadata", "_created_at", "_end_time")
+    
     def __init__(self,
                  work_hash: str,           # 作品唯一哈希
                  work_title: str,          # 作品标题
                  author: str,              # 原作者地址
                  copyright_type: str,      # 版权类型: sovereignty, instruction, proof, secondary
-                 rights_scope: Optional[List[str]] = None,  # 权利范围
+                 rights_scope: Optional[Iterable[str]] = None,  # 权利范围
                  parent_utxo: Optional[str] = None, # 父级UTXO标识（次级授权用）
                  metadata: Optional[Dict] = None):  # 其他元数据
         """
@@ -113,18 +157,30 @@ class CopyrightPayload:
                 - proof: 版权证明 凭证（已生效的授权，可证明）
                 - secondary: 次级授权 转授权（第三方从被授权人获得的部分权利）
             该属性变化遵循矿工状态机（Miner State Machine），矿工根据当前状态和UTXO类型决定如何处理。
-            rights_scope: 授权的权利范围列表，如["复制权", "发行权", "改编权"]
+            rights_scope: 授权的权利范围（任意可迭代对象），如["复制权", "发行权", "改编权"]
             parent_utxo: 父级UTXO（用于次级授权的继承关系）
             metadata: 其他元数据
         """
         self.work_hash = work_hash
         self.work_title = work_title
         self.author = author
-        self.copyright_type = copyright_type
-        self.rights_scope = rights_scope or ["复制权", "发行权", "改编权", "表演权"]
+        self.copyright_type = intern_type(copyright_type)
+        # 序列化时保持列表及其顺序（交易哈希依赖它）
+        self.rights_scope = list(rights_scope) if rights_scope else ["复制权", "发行权", "改编权", "表演权"]
         self.parent_utxo = parent_utxo
         self.metadata = metadata or {}
         self.created_at = time.time()
+    
+    @property
+    def created_at(self) -> float:
+        """UTXO创建时间戳（授权期限的起点）"""
+        return self._created_at
+    
+    @created_at.setter
+    def created_at(self, value: float):
+        # 到期时间只依赖created_at：赋值时算好，到期检查只做一次比较
+        self._created_at = value
+        self._end_time = int(value) + AUTHORIZATION_DURATION_SECONDS
         
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -156,12 +212,12 @@ class CopyrightPayload:
     
     def get_end_time(self) -> int:
         """
-        计算授权到期时间（动态计算）
+        授权到期时间（created_at 赋值时计算）
         
         Returns:
             授权到期时间戳（created_at + 3个月）
         """
-        return int(self.created_at) + AUTHORIZATION_DURATION_SECONDS
+        return self._end_time
     
     def is_expired(self, current_time: Optional[int] = None) -> bool:
         """
@@ -175,7 +231,7 @@ class CopyrightPayload:
         """
         if current_time is None:
             current_time = int(time.time())
-        return current_time >= self.get_end_time()
+        return current_time >= self._end_time
 
 
 class TimeLockScript:
@@ -188,6 +244,8 @@ class TimeLockScript:
     SCRIPT_TYPE_MULTISIG = "MULTISIG"    # 多重签名
     SCRIPT_TYPE_TIME_LOCK = "TIMELOCK"   # 时间锁
     
+    __slots__ = ("script_type", "addresses", "required_sig_num", "time_lock", "_cached_str", "_address_set")
+    
     def __init__(self, 
                  script_type: str,
                  addresses: List[str],
@@ -199,14 +257,17 @@ class TimeLockScript:
         
         Args:
             script_type: 脚本类型
-            addresses: 可以解锁的地址列表
+            addresses: 可以解锁的地址列表（保存为元组）
             required_sig_num: 多重签名需要的签名数量
             time_lock: 时间锁（只能在此时间之后花费）
         """
+        # 字段只在构造时设置一次（地址存为元组），因此缓存的脚本字符串和地址集合不会失效
         self.script_type = script_type
-        self.addresses = addresses
+        self.addresses = tuple(addresses)
         self.required_sig_num = required_sig_num
         self.time_lock = time_lock
+        self._cached_str = None
+        self._address_set = frozenset(self.addresses)
         
     def can_spend(self, current_time: int, signers: List[str], end_time: Optional[int] = None) -> bool:
         """
@@ -228,12 +289,27 @@ class TimeLockScript:
         if self.time_lock and current_time < self.time_lock:
             return False
         
-        # 检查签名数量和地址
-        valid_signers = [s for s in signers if s in self.addresses]
-        return len(valid_signers) >= self.required_sig_num
+        # 检查签名数量和地址（找到足够的签名者即返回，不构造列表）
+        address_set = self._address_set
+        
+        required = self.required_sig_num
+        if required == 1:
+            # 常见的单签（P2PKH）情况
+            return any(s in address_set for s in signers)
+        
+        count = 0
+        for s in signers:
+            if count >= required:
+                break
+            if s in address_set:
+                count += 1
+        return count >= required
     
     def to_string(self) -> str:
-        """转换为脚本字符串（简化版本）"""
+        """转换为脚本字符串（简化版本，首次调用后缓存）"""
+        if self._cached_str is not None:
+            return self._cached_str
+        
         parts = [self.script_type] # 脚本类型
         
         # 如果有时间锁
@@ -246,7 +322,8 @@ class TimeLockScript:
         
         parts.extend(self.addresses)
         
-        return "|".join(parts)
+        self._cached_str = "|".join(parts)
+        return self._cached_str
     
     @classmethod
     def from_string(cls, script_str: str):
@@ -275,11 +352,22 @@ class TimeLockScript:
         )
 
 
+def _window_start(scan_months: int, now: Optional[int] = None) -> int:
+    """最近 scan_months 个月的起始时间戳（now 为None时取当前时间）"""
+    if now is None:
+        now = int(time.time())
+    return now - (scan_months * 30 * 24 * 3600)
+
+
 class BlockchainUTXOManager:
     """
     基于区块链扫描的UTXO管理器
     通过扫描区块来重建UTXO状态，而不是维护全局UTXO池
     这是真正的区块链UTXO管理方式
+    
+    查询使用增量维护的扫描结果：第一次查询时扫描一遍，之后只应用新追加的区块；
+    时间窗口向前移动时，移出窗口的区块创建的、仍未花费的输出被逐块剔除。
+    链被替换（或区块时间戳不按链顺序递增而无法逐块剔除）时退回从头扫描。结果与每次调用 scan_blockchain 一致
     """
     
     def __init__(self, blockchain: List):
@@ -290,6 +378,145 @@ class BlockchainUTXOManager:
             blockchain: 区块链列表（CPCBlock对象列表）
         """
         self.blockchain = blockchain
+        
+        # 增量扫描状态（由 _lock 保护，多个验证线程可以共用一个管理器）
+        # 键为 (txid, vout) 元组：不必为每次查询格式化 "txid:vout" 字符串，txid字符串的哈希值也会被缓存
+        self._utxo_set: Dict[Tuple[str, int], UTXO] = {}  # (txid, vout) -> UTXO
+        self._by_address: Dict[str, Dict[Tuple[str, int], UTXO]] = {}  # 地址 -> {(txid, vout): UTXO}
+        # (地址, 作品哈希) -> {(txid, vout): proof UTXO}
+        self._proofs: Dict[Tuple[str, str], Dict[Tuple[str, int], UTXO]] = {}
+        self._applied_height = 0  # 已处理到的链高度
+        self._tip_block = None  # 已处理的最后一个区块（判断链是否被替换）
+        self._min_included_ts = float("inf")  # 已应用区块中最早的时间戳
+        self._max_excluded_ts = float("-inf")  # 因早于窗口而跳过（或已被剔除）的区块中最晚的时间戳
+        # 已应用的区块按链顺序：(时间戳, 该区块创建的 [((txid, vout), UTXO)])，区块移出窗口时据此剔除
+        self._applied_blocks = deque()
+        self._last_seen_ts = float("-inf")  # 最后处理的区块的时间戳
+        self._monotonic = True  # 已处理区块的时间戳是否按链顺序不减（逐块剔除的前提）
+        self._balance_cache: Dict[str, float] = {}  # 地址 -> 余额，UTXO集合变化时清空
+        self._lock = threading.Lock()
+    
+    def _index_utxo(self, key: Tuple[str, int], utxo: UTXO):
+        """加入UTXO集合及其二级索引"""
+        self._utxo_set[key] = utxo
+        self._by_address.setdefault(utxo.address, {})[key] = utxo
+        if utxo.utxo_type == "copyright" and utxo.payload and utxo.payload.get("copyright_type") == "proof":
+            self._proofs.setdefault((utxo.address, utxo.payload.get("work_hash")), {})[key] = utxo
+    
+    def _unindex_utxo(self, key: Tuple[str, int]):
+        """从UTXO集合及其二级索引中移除（不存在时忽略）"""
+        utxo = self._utxo_set.pop(key, None)
+        if utxo is None:
+            return
+        del self._by_address[utxo.address][key]
+        if utxo.utxo_type == "copyright" and utxo.payload and utxo.payload.get("copyright_type") == "proof":
+            del self._proofs[(utxo.address, utxo.payload.get("work_hash"))][key]
+    
+    def _apply_block(self, block) -> List[Tuple[Tuple[str, int], UTXO]]:
+        """
+        把一个区块应用到增量UTXO集合（与 scan_blockchain 对单个区块的处理一致）
+        
+        Returns:
+            该区块创建的 [((txid, vout), UTXO)]
+        """
+        # 循环中反复使用的属性和方法先取到局部变量
+        utxo_set = self._utxo_set
+        index_utxo = self._index_utxo
+        unindex_utxo = self._unindex_utxo
+        created = []
+        for tx in block.transactions:
+            # 消耗输入（移除被花费的UTXO）
+            for inp in tx.inputs:
+                key = (inp.txid, inp.vout)
+                if key in utxo_set:
+                    unindex_utxo(key)
+            
+            # 创建输出（添加新的UTXO）
+            txid = tx.txid
+            for vout, output in enumerate(tx.outputs):
+                utxo = UTXO(
+                    txid=txid,
+                    vout=vout,
+                    amount=output.amount,
+                    address=output.address,
+                    script_pubkey=output.script_pubkey,
+                    utxo_type=output.utxo_type,
+                    payload=output.payload
+                )
+                key = (txid, vout)
+                if key in utxo_set:  # 重复的交易ID覆盖旧输出（正常情况下不会发生）
+                    unindex_utxo(key)
+                index_utxo(key, utxo)
+                created.append((key, utxo))
+        return created
+    
+    def _evict_before(self, start_time: float):
+        """
+        剔除时间戳早于 start_time 的已应用区块创建的、仍未花费的输出
+        
+        只在区块时间戳按链顺序不减时调用：被剔除的区块位于已应用区块的最前面，
+        它花费的输出都由更早的区块创建，已经在窗口之外；它创建而已被花费的输出也已不在集合中
+        """
+        applied = self._applied_blocks
+        utxo_set = self._utxo_set
+        while applied and applied[0][0] < start_time:
+            timestamp, created = applied.popleft()
+            for key, utxo in created:
+                if utxo_set.get(key) is utxo:  # 没有被花费，也没有被重复的交易ID覆盖
+                    self._unindex_utxo(key)
+            self._max_excluded_ts = max(self._max_excluded_ts, timestamp)
+        self._min_included_ts = applied[0][0] if applied else float("inf")
+        self._balance_cache.clear()
+    
+    def _synced_utxos(self, start_time: Optional[int]) -> Dict[Tuple[str, int], UTXO]:
+        """
+        把增量UTXO集合更新到链尾，返回与 scan_blockchain(start_time) 相同的UTXO（键为 (txid, vout)）
+        
+        调用方必须持有 self._lock，返回的字典只能在持锁期间读取、不得修改
+        """
+        if not start_time:
+            start_time = float("-inf")
+        
+        chain = self.blockchain
+        height = self._applied_height
+        # 链被替换，或窗口向后移动（跳过的区块重新进入窗口）时从头扫描
+        rebuild = (height > len(chain)
+                   or (height and chain[height - 1] is not self._tip_block)
+                   or self._max_excluded_ts >= start_time > float("-inf"))
+        # 窗口向前移过已应用的区块：时间戳有序时逐块剔除，否则只能从头扫描
+        if not rebuild and start_time > self._min_included_ts:
+            if self._monotonic:
+                self._evict_before(start_time)
+            else:
+                rebuild = True
+        if rebuild:
+            self._utxo_set = {}
+            self._by_address = {}
+            self._proofs = {}
+            self._min_included_ts = float("inf")
+            self._max_excluded_ts = float("-inf")
+            self._applied_blocks.clear()
+            self._last_seen_ts = float("-inf")
+            self._monotonic = True
+            self._balance_cache.clear()
+            height = 0
+        
+        if height < len(chain):
+            self._balance_cache.clear()
+        for block in chain[height:]:
+            timestamp = block.timestamp
+            if timestamp < self._last_seen_ts:
+                self._monotonic = False
+            self._last_seen_ts = timestamp
+            if timestamp < start_time:
+                self._max_excluded_ts = max(self._max_excluded_ts, timestamp)
+                continue
+            self._min_included_ts = min(self._min_included_ts, timestamp)
+            self._applied_blocks.append((timestamp, self._apply_block(block)))
+        
+        self._applied_height = len(chain)
+        self._tip_block = chain[-1] if chain else None
+        return self._utxo_set
     
     def scan_blockchain(self, start_time: Optional[int] = None) -> Dict[str, UTXO]:
         """
@@ -301,7 +528,9 @@ class BlockchainUTXOManager:
         Returns:
             UTXO字典，key为"txid:vout"
         """
-        utxos: Dict[str, UTXO] = {}
+        # 扫描过程中只记录 (txid, vout) -> 输出 的引用，扫描结束后才为未花费的输出创建UTXO对象、
+        # 格式化 "txid:vout" 键：中途被花费的输出（大多数fuel找零）两者都不需要
+        unspent: Dict[Tuple[str, int], Any] = {}
         
         # 从创世区块开始扫描
         for block in self.blockchain:
@@ -313,27 +542,27 @@ class BlockchainUTXOManager:
             for tx in block.transactions:
                 # 消耗输入（移除被花费的UTXO）
                 for inp in tx.inputs:
-                    identifier = f"{inp.txid}:{inp.vout}"
-                    if identifier in utxos:
-                        del utxos[identifier]
+                    unspent.pop((inp.txid, inp.vout), None)
                 
-                # 创建输出（添加新的UTXO）
+                # 创建输出（记录新的未花费输出）
+                txid = tx.txid
                 for vout, output in enumerate(tx.outputs):
-                    utxo = UTXO(
-                        txid=tx.txid,
-                        vout=vout,
-                        amount=output.amount,
-                        address=output.address,
-                        script_pubkey=output.script_pubkey,
-                        utxo_type=output.utxo_type,
-                        payload=output.payload
-                    )
-                    identifier = utxo.get_identifier()
-                    utxos[identifier] = utxo
-        
-        return utxos
-    
-    def get_utxo(self, txid: str, vout: int, scan_months: int = 3) -> Optional[UTXO]:
+                    unspent[(txid, vout)] = output
+        
+        return {
+            f"{txid}:{vout}": UTXO(
+                txid=txid,
+                vout=vout,
+                amount=output.amount,
+                address=output.address,
+                script_pubkey=output.script_pubkey,
+                utxo_type=output.utxo_type,
+                payload=output.payload
+            )
+            for (txid, vout), output in unspent.items()
+        }
+    
+    def get_utxo(self, txid: str, vout: int, scan_months: int = 3, now: Optional[int] = None) -> Optional[UTXO]:
         """
         通过扫描区块获取指定key的UTXO
         
@@ -341,65 +570,101 @@ class BlockchainUTXOManager:
             txid: 交易ID
             vout: 输出索引
             scan_months: 扫描最近N个月的区块（默认3个月）
+            now: 当前时间戳（可选；批量验证时由调用方统一取一次）
             
         Returns:
             UTXO对象或None
         """
         # 计算起始时间（N个月前）
-        start_time = int(time.time()) - (scan_months * 30 * 24 * 3600)
+        start_time = _window_start(scan_months, now)
         
-        # 扫描区块，得到所有还未花费的UTXO
-        utxos = self.scan_blockchain(start_time=start_time)
+        # 所有还未花费的UTXO（增量维护，只应用上次查询之后的新区块）
+        with self._lock:
+            return self._synced_utxos(start_time).get((txid, vout))
+    
+    def get_utxos_bulk(self, keys: Iterable[Tuple[str, int]], scan_months: int = 3,
+                       now: Optional[int] = None) -> Dict[Tuple[str, int], UTXO]:
+        """
+        一次扫描区块获取多个UTXO（批量验证交易时使用，代替逐个调用 get_utxo）
         
-        identifier = f"{txid}:{vout}"
-        return utxos.get(identifier)
+        Args:
+            keys: (txid, vout) 的集合
+            scan_months: 扫描最近N个月的区块（默认3个月）
+            now: 当前时间戳（可选；批量验证时由调用方统一取一次）
+            
+        Returns:
+            {(txid, vout): UTXO}，不存在或已花费的key不在结果中
+        """
+        start_time = _window_start(scan_months, now)
+        
+        result = {}
+        with self._lock:
+            utxos = self._synced_utxos(start_time)
+            for key in keys:
+                utxo = utxos.get(key)
+                if utxo is not None:
+                    result[key] = utxo
+        return result
     
-    def get_utxos_by_address(self, address: str, scan_months: int = 3) -> List[UTXO]:
+    def get_utxos_by_address(self, address: str, scan_months: int = 3, now: Optional[int] = None) -> List[UTXO]:
         """
         获取某个地址的所有UTXO
         
         Args:
             address: 钱包地址
             scan_months: 扫描最近N个月的区块（默认3个月）
+            now: 当前时间戳（可选；批量验证时由调用方统一取一次）
             
         Returns:
             UTXO列表
         """
-        import time
-        start_time = int(time.time()) - (scan_months * 30 * 24 * 3600)
+        start_time = _window_start(scan_months, now)
         
-        utxos = self.scan_blockchain(start_time=start_time)
-        return [utxo for utxo in utxos.values() if utxo.address == address]
+        with self._lock:
+            self._synced_utxos(start_time)
+            return list(self._by_address.get(address, {}).values())
     
-    def get_balance(self, address: str, scan_months: int = 3) -> float:
+    def get_balance(self, address: str, scan_months: int = 3, now: Optional[int] = None) -> float:
         """
         计算某个地址的CPC余额
         
         Args:
             address: 钱包地址
             scan_months: 扫描最近N个月的区块（默认3个月）
+            now: 当前时间戳（可选；批量验证时由调用方统一取一次）
             
         Returns:
             余额
         """
-        utxos = self.get_utxos_by_address(address, scan_months)
-        return sum(utxo.amount for utxo in utxos)
+        start_time = _window_start(scan_months, now)
+        
+        # 同一状态下反复查询同一地址（钱包轮询、RPC）直接返回缓存的结果
+        with self._lock:
+            self._synced_utxos(start_time)
+            balance = self._balance_cache.get(address)
+            if balance is None:
+                utxos = self._by_address.get(address, {}).values()
+                # 按整数最小单位求和，避免浮点累加误差（如 1.0 + 3.94 = 4.9399999999999995）
+                balance = self._balance_cache[address] = sum(utxo.amount_sats for utxo in utxos) / COIN
+            return balance
     
-    def get_copyright_utxos(self, address: str, scan_months: int = 3) -> List[UTXO]:
+    def get_copyright_utxos(self, address: str, scan_months: int = 3, now: Optional[int] = None) -> List[UTXO]:
         """
         获取某个地址的所有版权UTXO（最近N个月）
         
         Args:
             address: 钱包地址
             scan_months: 扫描最近N个月的区块（默认3个月）
+            now: 当前时间戳（可选；批量验证时由调用方统一取一次）
             
         Returns:
             版权UTXO列表
         """
-        utxos = self.get_utxos_by_address(address, scan_months)
+        utxos = self.get_utxos_by_address(address, scan_months, now)
         return [utxo for utxo in utxos if utxo.utxo_type == "copyright"]
     
-    def verify_copyright_proof(self, address: str, work_hash: str, scan_months: int = 3) -> Optional[UTXO]:
+    def verify_copyright_proof(self, address: str, work_hash: str, scan_months: int = 3,
+                               now: Optional[int] = None) -> Optional[UTXO]:
         """
         验证某个地址是否有某作品的有效的版权证明UTXO（最近N个月）
         
@@ -407,18 +672,15 @@ class BlockchainUTXOManager:
             address: 公司地址
             work_hash: 作品哈希
             scan_months: 扫描最近N个月的区块（默认3个月）
+            now: 当前时间戳（可选；批量验证时由调用方统一取一次）
             
         Returns:
             有效的版权证明UTXO，如果不存在则返回None
         """
-        # 获取该地址的所有版权UTXO
-        copyright_utxos = self.get_copyright_utxos(address, scan_months)
-        
-        for utxo in copyright_utxos:
-            # 检查是否是证明类型的UTXO
-            if (utxo.payload and 
-                utxo.payload.get("copyright_type") == "proof" and
-                utxo.payload.get("work_hash") == work_hash):
-                    return utxo  # 找到有效的证明UTXO
+        start_time = _window_start(scan_months, now)
         
-        return None  # 未找到有效的证明
+        # 直接按 (地址, 作品哈希) 查证明UTXO索引；有多个时取最早创建的
+        with self._lock:
+            self._synced_utxos(start_time)
+            proofs = self._proofs.get((address, work_hash))
+            return next(iter(proofs.values()), None) if proofs else None